@@ -0,0 +1,210 @@
+import asyncio
+import dataclasses
+import json
+import os
+import types
+
+# Base seconds between runs of each scheduled job, overridable through the config's "intervals"
+DEFAULT_INTERVALS = {
+    'presence': 60,
+    'status': 720,
+    'information': 3600,
+    'rules': 9320
+}
+WEBHOOK_KINDS = ('server_status', 'server_information', 'server_rules')
+DEFAULT_POP_MESSAGE = "{players}/{maxplayers} players"
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class WebhookConfig:
+    channel_id: int
+    enabled: bool
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class BotConfig:
+    """A validated Bots/*.json config, with IDs and ports parsed and defaults resolved.
+
+    Instances are immutable: a hot reload builds a new one and swaps the reference.
+    """
+
+    bot_token: str
+    server_name: str
+    server_ip: str
+    server_port: int
+    query_port: int
+    server_status: WebhookConfig
+    server_information: WebhookConfig
+    server_rules: WebhookConfig
+    update_interval: float = 30
+    intervals: types.MappingProxyType = dataclasses.field(default_factory=lambda: types.MappingProxyType(DEFAULT_INTERVALS))
+    responses_file_path: str = 'responses.json'
+    fuzzy_threshold: float = None
+    history_file: str = None
+    pop_message: str = DEFAULT_POP_MESSAGE
+    connecting_message: str = "Offline!"
+    player_tiers: tuple = ()  # (min, max, message) of each conditionals.players entry
+    rules: tuple = ("No rules specified.",)
+    last_wipe: str = 'N/A'
+    next_wipe: str = 'N/A'
+    livemap: str = 'N/A'
+    map_image: str = None
+    show_players: bool = False
+    show_rules: tuple = ()
+
+
+def parse_bot_config(raw, source="config"):
+    """Validate a parsed JSON config and build its BotConfig, raising ValueError naming the bad field."""
+    def fail(field, problem):
+        raise ValueError(f"{source}: {field} {problem}")
+
+    def required(mapping, key, field):
+        if key not in mapping:
+            fail(field, "is missing")
+        return mapping[key]
+
+    def string(value, field):
+        if not isinstance(value, str):
+            fail(field, f"must be a string, got {value!r}")
+        return value
+
+    def integer(value, field, low, high):
+        # IDs and ports are often written as strings in the configs
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            fail(field, f"must be an integer, got {value!r}")
+        number = int(value) if isinstance(value, int) or value.strip().isdecimal() else None
+        if number is None:
+            fail(field, f"must be an integer, got {value!r}")
+        if not low <= number <= high:
+            fail(field, f"must be between {low} and {high}, got {number}")
+        return number
+
+    def positive(value, field):
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+            fail(field, f"must be a positive number of seconds, got {value!r}")
+        return value
+
+    def boolean(value, field):
+        if not isinstance(value, bool):
+            fail(field, f"must be true or false, got {value!r}")
+        return value
+
+    def strings(value, field):
+        if not isinstance(value, list):
+            fail(field, f"must be a list of strings, got {value!r}")
+        return tuple(string(item, f"{field}[{index}]") for index, item in enumerate(value))
+
+    if not isinstance(raw, dict):
+        fail("the config", "must be a JSON object")
+    fields = {}
+
+    fields['bot_token'] = string(required(raw, 'bot_token', 'bot_token'), 'bot_token')
+    if not fields['bot_token']:
+        fail('bot_token', "is empty")
+    fields['server_name'] = string(required(raw, 'server_name', 'server_name'), 'server_name')
+    fields['server_ip'] = string(required(raw, 'server_ip', 'server_ip'), 'server_ip')
+    for key in ('server_port', 'query_port'):
+        fields[key] = integer(required(raw, key, key), key, 1, 65535)
+
+    webhooks = required(raw, 'webhooks', 'webhooks')
+    if not isinstance(webhooks, dict):
+        fail('webhooks', "must be an object")
+    for kind in WEBHOOK_KINDS:
+        webhook = required(webhooks, kind, f"webhooks.{kind}")
+        if not isinstance(webhook, dict):
+            fail(f"webhooks.{kind}", "must be an object")
+        fields[kind] = WebhookConfig(
+            integer(required(webhook, 'channel_id', f"webhooks.{kind}.channel_id"), f"webhooks.{kind}.channel_id", 1, 2 ** 64 - 1),
+            boolean(required(webhook, 'enabled', f"webhooks.{kind}.enabled"), f"webhooks.{kind}.enabled")
+        )
+
+    if 'update_interval' in raw:
+        fields['update_interval'] = positive(raw['update_interval'], 'update_interval')
+    intervals = raw.get('intervals', {})
+    if not isinstance(intervals, dict):
+        fail('intervals', "must be an object")
+    for job, interval in intervals.items():
+        if job not in DEFAULT_INTERVALS:
+            fail(f"intervals.{job}", f"is not a job, expected one of {', '.join(DEFAULT_INTERVALS)}")
+        positive(interval, f"intervals.{job}")
+    fields['intervals'] = types.MappingProxyType({**DEFAULT_INTERVALS, **intervals})
+
+    for key in ('responses_file_path', 'history_file', 'pop_message', 'connecting_message', 'last_wipe', 'next_wipe', 'livemap', 'map_image'):
+        if raw.get(key) is not None:
+            fields[key] = string(raw[key], key)
+    try:
+        fields.get('pop_message', DEFAULT_POP_MESSAGE).format(players=0, maxplayers=0, queue=0, joining=0)
+    except (KeyError, IndexError, ValueError) as e:
+        fail('pop_message', f"is not a valid template: {e!r}")
+
+    if raw.get('fuzzy_threshold') is not None:
+        threshold = raw['fuzzy_threshold']
+        if isinstance(threshold, bool) or not isinstance(threshold, (int, float)) or not 0 <= threshold <= 1:
+            fail('fuzzy_threshold', f"must be a number from 0 to 1, got {threshold!r}")
+        fields['fuzzy_threshold'] = threshold
+
+    conditionals = raw.get('conditionals', {})
+    if not isinstance(conditionals, dict):
+        fail('conditionals', "must be an object")
+    tiers = conditionals.get('players', [])
+    if not isinstance(tiers, list):
+        fail('conditionals.players', "must be a list")
+    player_tiers = []
+    for index, tier in enumerate(tiers):
+        field = f"conditionals.players[{index}]"
+        if not isinstance(tier, dict):
+            fail(field, "must be an object")
+        low = integer(required(tier, 'min', f"{field}.min"), f"{field}.min", 0, 65535)
+        high = integer(required(tier, 'max', f"{field}.max"), f"{field}.max", low, 65535)
+        player_tiers.append((low, high, string(required(tier, 'message', f"{field}.message"), f"{field}.message")))
+    fields['player_tiers'] = tuple(player_tiers)
+
+    if 'rules' in raw:
+        fields['rules'] = strings(raw['rules'], 'rules')
+    if 'show_players' in raw:
+        fields['show_players'] = boolean(raw['show_players'], 'show_players')
+    if 'show_rules' in raw:
+        fields['show_rules'] = strings(raw['show_rules'], 'show_rules')
+
+    return BotConfig(**fields)
+
+
+def read_bot_config(file_path):
+    """Read and validate a single bot configuration file."""
+    with open(file_path, 'r') as f:
+        try:
+            raw = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{file_path}: invalid JSON: {e}") from None
+    return parse_bot_config(raw, file_path)
+
+
+def config_files(config_dir):
+    """Paths of every bot config in the directory."""
+    if not os.path.exists(config_dir):
+        raise FileNotFoundError(f"Configuration directory '{config_dir}' does not exist.")
+    return sorted(os.path.join(config_dir, filename) for filename in os.listdir(config_dir) if filename.endswith('.json'))
+
+
+async def load_bot_configs(config_dir="Bots", wanted=None):
+    """Yield (bot_config, bot_name) for each valid config as soon as it is parsed.
+
+    Listing and parsing run in the default executor, every file concurrently.
+    wanted(bot_name) can skip configs this process doesn't run before they are
+    read; invalid configs are reported and skipped so the others still start.
+    """
+    loop = asyncio.get_running_loop()
+    paths = await loop.run_in_executor(None, config_files, config_dir)
+    names = {path: os.path.splitext(os.path.basename(path))[0] for path in paths}
+
+    async def load(path):
+        return path, await loop.run_in_executor(None, read_bot_config, path)
+
+    pending = [load(path) for path in paths if wanted is None or wanted(names[path])]
+    for next_loaded in asyncio.as_completed(pending):
+        try:
+            path, bot_config = await next_loaded
+        except (OSError, ValueError) as e:
+            print(f"Skipping bot config: {e}")
+            continue
+        yield bot_config, names[path]
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+import aiohttp
+
+
+class SharedConnector(aiohttp.TCPConnector):
+    """TCP connector shared by every client's aiohttp session.
+
+    discord.py closes its session (and with it the connector) whenever a client
+    stops or restarts, so close() leaves the pool open; shutdown() really closes it.
+    """
+
+    def close(self):
+        done = self._loop.create_future()
+        done.set_result(None)
+        return done
+
+    async def shutdown(self):
+        await super().close()
+
+
+class ConnectionPool:
+    """One connector and login pacing shared by every bot client in the process.
+
+    Logins and gateway re-identifies are handed out one slot every
+    login_interval seconds, in request order, so a restart or a gateway outage
+    doesn't open hundreds of TLS connections and IDENTIFYs at the same moment.
+    """
+
+    def __init__(self, login_interval=0.5, keepalive_timeout=30, dns_cache_ttl=300):
+        self.login_interval = login_interval
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.connector = None
+        self.next_slot = 0.0  # Loop time of the next free login slot
+
+    def get_connector(self):
+        """The process-wide connector, created on first use inside the running loop."""
+        if self.connector is None:
+            # No connection limit: every bot's gateway websocket holds a connection for its whole life
+            self.connector = SharedConnector(limit=0, keepalive_timeout=self.keepalive_timeout, ttl_dns_cache=self.dns_cache_ttl, enable_cleanup_closed=True)
+        return self.connector
+
+    def client_options(self):
+        """Keyword arguments for discord.Client to use the shared connector."""
+        return {'connector': self.get_connector()}
+
+    async def wait_for_login_slot(self):
+        """Wait for this caller's turn to open a gateway connection."""
+        loop = asyncio.get_running_loop()
+        slot = max(loop.time(), self.next_slot)
+        self.next_slot = slot + self.login_interval
+        await asyncio.sleep(slot - loop.time())
+
+    def attach(self, client):
+        """Pace the client's gateway re-identifies through the shared login slots."""
+        async def before_identify_hook(shard_id, *, initial=False):
+            if initial:
+                return  # The login itself already waited for a slot
+            await asyncio.sleep(5.0)  # discord.py's default: one IDENTIFY per token every 5 seconds
+            await self.wait_for_login_slot()
+
+        client.before_identify_hook = before_identify_hook
+
+    async def close(self):
+        if self.connector is not None:
+            await self.connector.shutdown()
+            self.connector = None
+            logging.info("Closed the shared connection pool.")
+
+
+connection_pool = ConnectionPool()  # Shared by every bot in the process
@@ -0,0 +1,74 @@
+import math
+import re
+
+NGRAM_SIZE = 3
+NON_WORD = re.compile(r'[\W_]+')
+
+
+def char_ngrams(text):
+    """Character trigrams of text, lowercased with punctuation folded to single spaces."""
+    text = ' ' + NON_WORD.sub(' ', text.lower()).strip() + ' '
+    counts = {}
+    for start in range(len(text) - NGRAM_SIZE + 1):
+        ngram = text[start:start + NGRAM_SIZE]
+        counts[ngram] = counts.get(ngram, 0) + 1
+    return counts
+
+
+class FuzzyIndex:
+    """Character n-gram TF-IDF vectors of every key in a responses dict.
+
+    The key vectors are stored as a sparse matrix in inverted form (n-gram ->
+    postings of key number and weight), so scoring a message against every key
+    is one sparse matrix-vector product that only touches the message's n-grams.
+    """
+
+    def __init__(self, responses):
+        self.keys = tuple(responses)
+        key_ngrams = [char_ngrams(key) for key in self.keys]
+
+        document_frequency = {}
+        for ngrams in key_ngrams:
+            for ngram in ngrams:
+                document_frequency[ngram] = document_frequency.get(ngram, 0) + 1
+        key_count = len(self.keys)
+        self.idf = {ngram: math.log((1 + key_count) / (1 + frequency)) + 1 for ngram, frequency in document_frequency.items()}
+        self.unseen_idf = math.log(1 + key_count) + 1
+
+        postings = {}
+        for key_number, ngrams in enumerate(key_ngrams):
+            weights = {ngram: count * self.idf[ngram] for ngram, count in ngrams.items()}
+            norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+            for ngram, weight in weights.items():
+                postings.setdefault(ngram, []).append((key_number, weight / norm))
+        self.postings = {ngram: tuple(entries) for ngram, entries in postings.items()}
+
+    def state(self):
+        """Plain, marshal-able form of the index for response packs."""
+        return (self.keys, self.idf, self.unseen_idf, self.postings)
+
+    @classmethod
+    def from_state(cls, state):
+        index = cls.__new__(cls)
+        index.keys, index.idf, index.unseen_idf, index.postings = state
+        return index
+
+    def search(self, text, threshold):
+        """Return the key most similar to text with a cosine score of at least threshold, or None."""
+        # N-grams no key contains get the idf of an unseen term; they only add to the message's norm
+        weights = {ngram: count * self.idf.get(ngram, self.unseen_idf) for ngram, count in char_ngrams(text).items()}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+
+        scores = {}
+        for ngram, weight in weights.items():
+            for key_number, key_weight in self.postings.get(ngram, ()):
+                scores[key_number] = scores.get(key_number, 0.0) + weight * key_weight
+
+        if not scores:
+            return None
+
+        # Ties go to the key earliest in the file, like the keyword path
+        best_key, best_score = min(scores.items(), key=lambda item: (-item[1], item[0]))
+        if best_score / norm < threshold:
+            return None
+        return self.keys[best_key]
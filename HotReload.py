@@ -0,0 +1,73 @@
+import asyncio
+import os
+from ResponseStore import response_store
+
+
+def scan_mtimes(config_dir, response_paths):
+    """Stat every bot config and loaded responses file, returning {path: mtime}."""
+    mtimes = {}
+    paths = [os.path.join(config_dir, filename) for filename in os.listdir(config_dir) if filename.endswith('.json')]
+    for path in paths + list(response_paths):
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            pass  # Removed between listing and stat; picked up on the next scan
+    return mtimes
+
+
+class HotReloader:
+    """Watch response files and Bots/ configs from a single mtime polling task."""
+
+    def __init__(self, fleet, config_dir="Bots", interval=5):
+        self.fleet = fleet
+        self.config_dir = config_dir
+        self.interval = interval
+
+    def is_bot_config(self, path):
+        return os.path.dirname(path) == self.config_dir
+
+    async def run(self):
+        """Poll for changes forever, reloading whatever changed off the event loop."""
+        loop = asyncio.get_running_loop()
+        previous = await loop.run_in_executor(None, scan_mtimes, self.config_dir, list(response_store.response_sets))
+
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                current = await loop.run_in_executor(None, scan_mtimes, self.config_dir, list(response_store.response_sets))
+                await self.apply_changes(loop, previous, current)
+                previous = current
+            except Exception as e:
+                print(f"Error during hot reload: {e}")
+
+    async def apply_changes(self, loop, previous, current):
+        """Reload changed response files and start, update or stop bots for changed configs."""
+        for path, mtime in current.items():
+            if previous.get(path) == mtime:
+                continue
+
+            if not self.is_bot_config(path):
+                # Parse off the loop; the store swaps the shared set in a single assignment
+                await loop.run_in_executor(None, response_store.load, path)
+                print(f"Reloaded responses file: {path}")
+                continue
+
+            bot_name = os.path.splitext(os.path.basename(path))[0]
+            if not self.fleet.owns(bot_name):
+                continue  # Another worker's shard
+            try:
+                bot_config = await loop.run_in_executor(None, self.fleet.read_config, path)
+            except (OSError, ValueError) as e:
+                # A running bot keeps its last good config until the file is fixed
+                print(f"Ignoring bot config change: {e}")
+                continue
+            if bot_name in self.fleet.bots:
+                await self.fleet.update_bot(bot_config, bot_name)
+            else:
+                self.fleet.start_bot(bot_config, bot_name)
+
+        for path in previous:
+            if path not in current and self.is_bot_config(path):
+                bot_name = os.path.splitext(os.path.basename(path))[0]
+                if bot_name in self.fleet.bots:
+                    await self.fleet.stop_bot(bot_name)
@@ -1,33 +1,74 @@
 import random
-import json
 import logging
-import re
 import os  # To handle file paths
+import time
 import discord
 from discord.ext import commands
+from ResponseStore import response_store
+from OutboundQueue import outbound_queue
+from PurgeEngine import PurgeEngine
+from ResponseProfiles import Profile, ResponseProfiles
+from Metrics import metrics
+
+# Per-message log lines go through their own logger so they can be sampled or silenced under load
+message_log = logging.getLogger('LifxChatBot.messages')
+
+# Game switch commands -> (response file name, display name)
+GAME_COMMANDS = {
+    '!botchangetodayzchat': ("dayz", "DayZ"),
+    '!botchangelifeisfeudalchat': ("lifeisfeudal", "Life is Feudal"),
+    '!botchangerustchat': ("rust", "Rust"),
+    '!botchangeconanchat': ("conan", "Conan"),
+    '!botchange7daystodiechat': ("7daystodie", "7 Days to Die"),
+    '!botchangeLifxModdingchat': ("lifxmodding", "LIFX modding")  # Uses the specific file in modding folder
+}
+
+
+class SampledFilter(logging.Filter):
+    """Let through a random fraction of records; dropped ones are never formatted."""
+
+    def __init__(self, sample_rate):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record):
+        return random.random() < self.sample_rate
+
+
+def set_message_log_sampling(sample_rate):
+    """Log only this fraction of per-message lines (1 logs all of them, 0 none)."""
+    for log_filter in list(message_log.filters):
+        message_log.removeFilter(log_filter)
+    if sample_rate < 1:
+        message_log.addFilter(SampledFilter(sample_rate))
+
 
 class LifxChatBot:
-    def __init__(self, link_channel_id):
-        self.responses_file_path = 'responses.json'  # Default responses file path
-        self.responses = self.load_responses(self.responses_file_path)
-        self.chatbot_enabled = True  # Global chatbot status
-        self.channel_status = {}  # Track channel-specific status (enabled/disabled)
+    def __init__(self, link_channel_id, fuzzy_threshold=None, profile_state_file='chat_profiles.json', bot_name='default', responses_file_path='responses.json'):
+        # Response pack and enabled flag per guild/channel, falling back to the config's responses file
+        self.profiles = ResponseProfiles(profile_state_file, Profile(responses_file_path, True))
+        response_store.load(self.profiles.default.responses_file_path)
         self.link_channel_id = link_channel_id  # Channel ID for sending links
+        self.fuzzy_threshold = fuzzy_threshold  # Minimum similarity for fuzzy matches; None disables them
+        self.purge_engine = PurgeEngine(bot_name=bot_name)  # Runs the !lifxclean* purges in the background
+        self.bot_name = bot_name  # Metrics label
         logging.info("LifxChatBot initialized with default responses.")
 
-    def load_responses(self, file_path):
-        """Load responses from a JSON file."""
+    def set_default_responses(self, responses_file_path):
+        """Switch the responses used where no guild or channel picked a pack. Returns False if the file failed to load."""
         try:
-            with open(file_path, 'r') as f:
-                responses = json.load(f)
-            logging.info(f"Loaded responses from {file_path}")
-            return responses
-        except FileNotFoundError as e:
-            logging.error(f"Could not find responses file: {e}")
-            return {}
-
-    def change_responses_file(self, file_name):
-        """Change the response file used for chatbot responses based on the selected file."""
+            response_set = response_store.load(responses_file_path)
+        except (OSError, ValueError) as e:
+            logging.error(f"Could not read responses file {responses_file_path}: {e}")
+            response_set = None
+        if not response_set:
+            logging.error(f"Failed to load default responses from {responses_file_path}")
+            return False
+        self.profiles.default = self.profiles.default._replace(responses_file_path=responses_file_path)
+        return True
+
+    def load_responses_file(self, file_name):
+        """Load the response file for a game name and return its path, or None if it failed."""
         # Construct the file path for the selected response file
         if file_name == "lifxmodding":
             new_file_path = os.path.join("modding", "responses_lifxmodding.json")
@@ -36,71 +77,70 @@ class LifxChatBot:
 
         logging.debug(f"Attempting to load responses from {new_file_path}")
 
-        # Clear previous responses before loading new ones
-        self.responses.clear()  # Clear any existing responses
-
-        self.responses = self.load_responses(new_file_path)
-        if self.responses:
-            self.responses_file_path = new_file_path
-            logging.info(f"Responses file changed to {new_file_path}")
-            return True
+        # Shared response set; the file is only parsed if it changed on disk
+        response_set = response_store.load(new_file_path)
+        if response_set:
+            return response_set.file_path
         else:
             logging.error(f"Failed to load responses from {new_file_path}")
-            return False
+            return None
 
-    def get_response(self, user_input):
-        """Get a random response based on user input."""
+    def get_response(self, user_input, response_set=None):
+        """Get a random response based on user input, from the default response set unless one is given."""
+        started = time.perf_counter()
         user_input = user_input.lower()  # Normalize user input to lowercase
-        logging.debug(f"User input received: {user_input}")  # Log user input
-
-        # Check for direct matches in responses
-        if user_input in self.responses:
-            responses = self.responses[user_input]
-            if isinstance(responses, list) and responses:
-                response = random.choice(responses)
-                logging.info(f"Response found for exact match: {response}")
-                return response
-
-        # Improved keyword matching using regex
-        for key in self.responses.keys():
-            pattern = re.compile(r'\b' + re.escape(key.lower()) + r'\b')
-            if pattern.search(user_input):
-                responses = self.responses[key]
-                if isinstance(responses, list) and responses:
-                    response = random.choice(responses)
-                    logging.info(f"Response found for keyword match '{key}': {response}")
-                    return response
-
-        logging.warning(f"No response found for user input: {user_input}")
-        return None
+        message_log.debug("User input received: %s", user_input)
+
+        if response_set is None:
+            response_set = response_store.get(self.profiles.default.responses_file_path)
+
+        # Direct match first, then the keyword index built when the responses were loaded
+        match = 'exact'
+        key = user_input if response_set.responses.get(user_input) else None
+        if key is None:
+            match = 'keyword'
+            key = response_set.keyword_index.search(user_input)
+
+        # Fuzzy matching only runs when the exact and keyword paths missed
+        if key is None and self.fuzzy_threshold is not None:
+            match = 'fuzzy'
+            key = response_set.fuzzy_index.search(user_input, self.fuzzy_threshold)
+
+        response = random.choice(response_set.responses[key]) if key is not None else None
+        if response is None:
+            match = 'miss'
+        metrics.observe('lifx_response_match_seconds', time.perf_counter() - started, bot=self.bot_name)
+        metrics.inc('lifx_response_matches_total', bot=self.bot_name, match=match)
+
+        if response is None:
+            message_log.warning("No response found for user input: %s", user_input)
+        else:
+            message_log.info("Response found for %s match '%s': %s", match, key, response)
+        return response
 
     async def handle_message(self, message):
         """Handle incoming Discord messages."""
         if message.author.bot:
-            logging.info(f"Ignored message from bot: {message.content}")
+            message_log.info("Ignored message from bot: %s", message.content)
             return  # Ignore messages from bots
 
         if message.content.startswith('!'):
             await self.handle_command(message)
             return  # Return after processing the command
 
-        if not self.chatbot_enabled:
-            logging.info("Chatbot is globally disabled, ignoring message.")
-            return
-
-        channel_status = self.channel_status.get(message.channel.id, True)
-        if not channel_status:
-            logging.info(f"Chatbot is disabled in channel: {message.channel.name}, ignoring message.")
+        profile = self.profiles.resolve(message.guild.id if message.guild else None, message.channel.id)
+        if not profile.enabled:
+            message_log.info("Chatbot is disabled in channel: %s, ignoring message.", message.channel.name)
             return
 
-        logging.info(f"Handling message from {message.author}: {message.content}")
-        response = self.get_response(message.content)
+        message_log.info("Handling message from %s: %s", message.author, message.content)
+        response = self.get_response(message.content, response_store.get(profile.responses_file_path))
         
         if response is not None:
-            await message.channel.send(response)
-            logging.info(f"Sent response: {response}")
+            await outbound_queue.send(message.channel, response, bot=self.bot_name)
+            message_log.info("Sent response: %s", response)
         else:
-            logging.info(f"Ignored unrelated message: {message.content}")
+            message_log.info("Ignored unrelated message: %s", message.content)
 
     async def handle_command(self, message):
         """Handle admin commands."""
@@ -110,77 +150,53 @@ class LifxChatBot:
 
         command = message.content.split(' ', 1)
         
-        if command[0] == '!lifxclearchannel':
-            await message.channel.purge()
-            logging.info(f"Cleared all messages in channel: {message.channel.name}")
-
-        elif command[0] == '!lifxcleanchannel':
-            await message.channel.purge(limit=None, check=lambda m: m.author.bot)
-            logging.info(f"Cleared bot messages in channel: {message.channel.name}")
+        if command[0] in ('!lifxclearchannel', '!lifxcleanchannel', '!lifxcleanbotdiscord'):
+            if command[0] == '!lifxclearchannel':
+                started = self.purge_engine.start(message, [message.channel], description="messages")
+            elif command[0] == '!lifxcleanchannel':
+                started = self.purge_engine.start(message, [message.channel], check=lambda m: m.author.bot, description="bot messages")
+            else:
+                started = self.purge_engine.start(message, message.guild.text_channels, check=lambda m: m.author.bot, description="bot messages")
+            if started:
+                logging.info(f"Started purge {command[0]} in guild: {message.guild.name}")
+            else:
+                await outbound_queue.send(message.channel, "A purge is already running in this server, use !lifxcancelpurge to stop it.", dedupe=False, bot=self.bot_name)
 
-        elif command[0] == '!lifxcleanbotdiscord':
-            for channel in message.guild.text_channels:
-                await channel.purge(limit=None, check=lambda m: m.author.bot)
-            logging.info("Cleared all bot messages from the server.")
+        elif command[0] == '!lifxcancelpurge':
+            if not self.purge_engine.cancel(message.guild.id):
+                await outbound_queue.send(message.channel, "No purge is running in this server.", dedupe=False, bot=self.bot_name)
 
         elif command[0] == '!lifxtogglechatbot':
-            self.chatbot_enabled = not self.chatbot_enabled
-            response = "I have woke up" if self.chatbot_enabled else "Preparing to sleep..."
-            await message.channel.send(response)
-            logging.info(f"Chatbot status changed: {self.chatbot_enabled}")
+            # Toggles the chatbot for the whole server; while it sleeps, channel toggles are ignored
+            enabled = not self.profiles.resolve(message.guild.id, None).enabled
+            self.profiles.update_guild(message.guild.id, enabled=enabled)
+            response = "I have woke up" if enabled else "Preparing to sleep..."
+            await outbound_queue.send(message.channel, response, dedupe=False, bot=self.bot_name)
+            logging.info(f"Chatbot status changed for {message.guild.name}: {enabled}")
 
         elif command[0] == '!lifxtogglechannelchatbot':
-            channel_status = self.channel_status.get(message.channel.id, True)
-            self.channel_status[message.channel.id] = not channel_status
-            response = "I am now active in this channel" if not channel_status else "I have been asked to ignore this channel"
-            await message.channel.send(response)
-            logging.info(f"Channel chatbot status changed for {message.channel.name}: {self.channel_status[message.channel.id]}")
+            if not self.profiles.resolve(message.guild.id, None).enabled:
+                await outbound_queue.send(message.channel, "I am asleep in this server, use !lifxtogglechatbot to wake me up", dedupe=False, bot=self.bot_name)
+                return
+            enabled = not self.profiles.resolve(message.guild.id, message.channel.id).enabled
+            self.profiles.update_channel(message.channel.id, enabled=enabled)
+            response = "I am now active in this channel" if enabled else "I have been asked to ignore this channel"
+            await outbound_queue.send(message.channel, response, dedupe=False, bot=self.bot_name)
+            logging.info(f"Channel chatbot status changed for {message.channel.name}: {enabled}")
 
         elif command[0] == '!lifxrestartbot':
-            await message.channel.send("Bot is restarting... (This is a placeholder)")
+            await outbound_queue.send(message.channel, "Bot is restarting... (This is a placeholder)", dedupe=False, bot=self.bot_name)
             logging.info("Bot restart command issued.")
 
-        # Commands for changing the responses based on game
-        elif command[0] == '!botchangetodayzchat':
-            success = self.change_responses_file("dayz")
-            if success:
-                await message.channel.send("Switched to DayZ chat responses!")
-            else:
-                await message.channel.send("Failed to load DayZ chat responses.")
-
-        elif command[0] == '!botchangelifeisfeudalchat':
-            success = self.change_responses_file("lifeisfeudal")
-            if success:
-                await message.channel.send("Switched to Life is Feudal chat responses!")
-            else:
-                await message.channel.send("Failed to load Life is Feudal chat responses.")
-
-        elif command[0] == '!botchangerustchat':
-            success = self.change_responses_file("rust")
-            if success:
-                await message.channel.send("Switched to Rust chat responses!")
+        # Commands for changing the responses based on game, for this channel or with "server" for the whole server
+        elif command[0] in GAME_COMMANDS:
+            file_name, display_name = GAME_COMMANDS[command[0]]
+            responses_file_path = self.load_responses_file(file_name)
+            if responses_file_path is None:
+                await outbound_queue.send(message.channel, f"Failed to load {display_name} chat responses.", dedupe=False, bot=self.bot_name)
+            elif len(command) > 1 and command[1].strip().lower() == 'server':
+                self.profiles.update_guild(message.guild.id, responses_file_path=responses_file_path)
+                await outbound_queue.send(message.channel, f"Switched this server to {display_name} chat responses!", dedupe=False, bot=self.bot_name)
             else:
-                await message.channel.send("Failed to load Rust chat responses.")
-
-        elif command[0] == '!botchangeconanchat':
-            success = self.change_responses_file("conan")
-            if success:
-                await message.channel.send("Switched to Conan chat responses!")
-            else:
-                await message.channel.send("Failed to load Conan chat responses.")
-
-        elif command[0] == '!botchange7daystodiechat':
-            success = self.change_responses_file("7daystodie")
-            if success:
-                await message.channel.send("Switched to 7 Days to Die chat responses!")
-            else:
-                await message.channel.send("Failed to load 7 Days to Die chat responses.")
-
-        # New command for modding chat responses
-        elif command[0] == '!botchangeLifxModdingchat':
-            success = self.change_responses_file("lifxmodding")  # Use the specific file in modding folder
-            if success:
-                await message.channel.send("Switched to LIFX modding chat responses!")
-            else:
-                await message.channel.send("Failed to load LIFX modding chat responses.")
-
+                self.profiles.update_channel(message.channel.id, responses_file_path=responses_file_path)
+                await outbound_queue.send(message.channel, f"Switched to {display_name} chat responses!", dedupe=False, bot=self.bot_name)
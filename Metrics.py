@@ -0,0 +1,166 @@
+import asyncio
+import bisect
+import contextlib
+import json
+import logging
+import time
+
+# Upper bounds in seconds of the latency histogram buckets, Prometheus-style
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Bucket counts (made cumulative on export), sum and count of observed values."""
+
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile, or None if nothing was observed."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+class MetricsRegistry:
+    """Process-wide counters and latency histograms, labelled per bot, server or request kind.
+
+    Recording is a dict lookup and an increment, so it is cheap enough for the
+    message hot path. Gauges are pulled from collectors only when exported.
+    """
+
+    def __init__(self):
+        self.counters = {}  # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> Histogram
+        self.collectors = []  # (prefix, callable returning {name: value})
+        self.server = None
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(value)
+
+    @contextlib.contextmanager
+    def timer(self, name, **labels):
+        """Observe the seconds spent in the with block, whether or not it raised."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def add_collector(self, prefix, collect):
+        """Export the values of collect() as gauges named prefix + key."""
+        self.collectors.append((prefix, collect))
+
+    def gauges(self):
+        return {prefix + name: value for prefix, collect in self.collectors for name, value in collect().items()}
+
+    def snapshot(self):
+        """Everything recorded so far as plain JSON-able data."""
+        return {
+            'counters': [{'name': name, 'labels': dict(labels), 'value': value} for (name, labels), value in self.counters.items()],
+            'histograms': [
+                {
+                    'name': name,
+                    'labels': dict(labels),
+                    'count': histogram.count,
+                    'sum': round(histogram.total, 6),
+                    'p50': histogram.quantile(0.5),
+                    'p99': histogram.quantile(0.99)
+                }
+                for (name, labels), histogram in self.histograms.items()
+            ],
+            'gauges': self.gauges()
+        }
+
+    def render(self):
+        """Everything recorded so far in the Prometheus text exposition format."""
+        lines = []
+        for (name, labels), value in sorted(self.counters.items()):
+            lines.append(f"{name}{format_labels(labels)} {value}")
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{format_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{name}_sum{format_labels(labels)} {histogram.total}")
+            lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+        for name, value in sorted(self.gauges().items()):
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    async def monitor_loop_lag(self, interval=0.5, **labels):
+        """Record how late the event loop wakes up from a sleep of interval seconds."""
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            self.observe('lifx_event_loop_lag_seconds', max(0.0, loop.time() - started - interval), **labels)
+
+    async def serve(self, host='127.0.0.1', port=9100):
+        """Serve /metrics (Prometheus text) and /metrics.json on a local HTTP port."""
+        self.server = await asyncio.start_server(self.handle_request, host, port)
+        logging.info(f"Serving metrics on http://{host}:{port}/metrics")
+        return self.server
+
+    async def handle_request(self, reader, writer):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 5)
+            while (await asyncio.wait_for(reader.readline(), 5)) not in (b'\r\n', b'\n', b''):
+                pass  # Headers are not needed
+            parts = request_line.decode('latin-1').split()
+            path = parts[1] if len(parts) > 1 else '/'
+
+            if path == '/metrics':
+                status, content_type, body = '200 OK', 'text/plain; version=0.0.4', self.render()
+            elif path == '/metrics.json':
+                status, content_type, body = '200 OK', 'application/json', json.dumps(self.snapshot())
+            else:
+                status, content_type, body = '404 Not Found', 'text/plain', "Not found\n"
+
+            body = body.encode('utf-8')
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1')
+                + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in labels) + "}"
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+metrics = MetricsRegistry()  # Shared by every bot in the process
@@ -0,0 +1,155 @@
+import asyncio
+import collections
+import contextvars
+import logging
+import time
+import discord
+from Metrics import metrics
+
+# Bot whose Discord requests run in the current context, so 429s that discord.py
+# only logs can still be counted per bot
+request_bot = contextvars.ContextVar('request_bot', default='default')
+
+
+class RateLimitCounter(logging.Handler):
+    """Count the 429s discord.py retries internally, which it only reports through logging."""
+
+    def __init__(self, outbound_queue):
+        super().__init__(logging.WARNING)
+        self.outbound_queue = outbound_queue
+
+    def emit(self, record):
+        if 'rate limited' in record.getMessage():
+            self.outbound_queue.rate_limited += 1
+            metrics.inc('lifx_discord_rate_limited_total', bot=request_bot.get())
+
+
+class OutboundQueue:
+    """Per-channel outbound queue that paces sends to Discord's per-channel bucket.
+
+    Identical text replies queued for the same channel are merged into one send,
+    and ones repeating a reply sent within dedupe_window seconds are dropped.
+    """
+
+    def __init__(self, rate=5, per=5.0, dedupe_window=10.0, idle_timeout=60):
+        self.rate = rate
+        self.per = per
+        self.dedupe_window = dedupe_window
+        self.idle_timeout = idle_timeout
+        self.queues = {}  # channel_id -> asyncio.Queue of (action, kind, bot, future)
+        self.workers = {}  # channel_id -> worker task
+        self.pending = {}  # (channel_id, content) -> future of the queued send
+        self.recent = {}  # (channel_id, content) -> loop time the reply was sent
+        self.sent = 0
+        self.merged = 0
+        self.dropped = 0
+        self.rate_limited = 0
+        logging.getLogger('discord.http').addHandler(RateLimitCounter(self))
+
+    def depth(self):
+        """Number of messages waiting across all channels."""
+        return sum(queue.qsize() for queue in self.queues.values())
+
+    def stats(self):
+        """Queue depth and counters for status reports."""
+        return {
+            'queue_depth': self.depth(),
+            'sent': self.sent,
+            'merged': self.merged,
+            'dropped': self.dropped,
+            'rate_limited': self.rate_limited
+        }
+
+    async def send(self, channel, content=None, embed=None, dedupe=True, bot='default'):
+        """Queue a message for the channel and return the sent message (None if dropped).
+
+        bot labels the request's metrics.
+        """
+        if not dedupe or embed is not None:
+            return await self.submit(channel, lambda: channel.send(content=content, embed=embed), kind='send', bot=bot)
+
+        loop = asyncio.get_running_loop()
+        reply_key = (channel.id, content)
+        if reply_key in self.pending:
+            self.merged += 1
+            return await asyncio.shield(self.pending[reply_key])
+
+        sent_at = self.recent.get(reply_key)
+        if sent_at is not None and loop.time() - sent_at < self.dedupe_window:
+            self.dropped += 1
+            return None
+
+        future = self.enqueue(channel, lambda: channel.send(content=content), 'send', bot)
+        self.pending[reply_key] = future
+        try:
+            message = await asyncio.shield(future)
+            self.recent[reply_key] = loop.time()
+            self.prune_recent(loop.time())
+            return message
+        finally:
+            if self.pending.get(reply_key) is future:
+                del self.pending[reply_key]
+
+    async def submit(self, channel, action, kind='edit', bot='default'):
+        """Queue any REST call against the channel (a send, an edit) and return its result."""
+        return await self.enqueue(channel, action, kind, bot)
+
+    def enqueue(self, channel, action, kind, bot='default'):
+        future = asyncio.get_running_loop().create_future()
+        queue = self.queues.get(channel.id)
+        if queue is None:
+            queue = self.queues[channel.id] = asyncio.Queue()
+        queue.put_nowait((action, kind, bot, future))
+        if channel.id not in self.workers:
+            self.workers[channel.id] = asyncio.ensure_future(self.run_channel(channel.id, queue))
+        return future
+
+    def prune_recent(self, now):
+        if len(self.recent) > 1000:
+            self.recent = {key: sent_at for key, sent_at in self.recent.items() if now - sent_at < self.dedupe_window}
+
+    async def run_channel(self, channel_id, queue):
+        """Drain one channel's queue, keeping at most `rate` calls in any `per` seconds."""
+        loop = asyncio.get_running_loop()
+        sent_times = collections.deque()
+
+        while True:
+            try:
+                action, kind, bot, future = await asyncio.wait_for(queue.get(), self.idle_timeout)
+            except asyncio.TimeoutError:
+                if queue.empty():
+                    del self.queues[channel_id]
+                    del self.workers[channel_id]
+                    return
+                continue
+
+            if future.cancelled():
+                continue
+
+            while len(sent_times) >= self.rate:
+                wait = sent_times[0] + self.per - loop.time()
+                if wait <= 0:
+                    sent_times.popleft()
+                else:
+                    await asyncio.sleep(wait)
+            sent_times.append(loop.time())
+
+            request_bot.set(bot)  # The worker is shared by every bot posting to this channel
+            started = time.perf_counter()
+            try:
+                result = await action()
+                self.sent += 1
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                if isinstance(e, discord.HTTPException) and e.status == 429:
+                    self.rate_limited += 1
+                    metrics.inc('lifx_discord_rate_limited_total', bot=bot)
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                metrics.observe('lifx_discord_request_seconds', time.perf_counter() - started, kind=kind, bot=bot)
+
+
+outbound_queue = OutboundQueue()  # Shared by every bot in the process
+metrics.add_collector('lifx_outbound_', outbound_queue.stats)
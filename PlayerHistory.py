@@ -0,0 +1,157 @@
+import bisect
+import itertools
+import mmap
+import operator
+import os
+import struct
+import time
+
+HEADER = struct.Struct('<4sIII')  # magic, capacity, head, count
+MAGIC = b'PHS1'
+# Bytes per sample across the column arrays: timestamp (d), players (i), max_players (i), online (B)
+SAMPLE_SIZE = 8 + 4 + 4 + 1
+# A sample stands for at most this many seconds, so gaps while the bot was down don't count
+MAX_SAMPLE_GAP = 600
+
+
+class PlayerHistory:
+    """Fixed-size ring buffer of (timestamp, players, max_players, online) samples.
+
+    The samples live in four typed column views over one buffer, either in memory
+    or in a memory-mapped file when file_path is given, so history survives restarts.
+    """
+
+    def __init__(self, capacity=10080, file_path=None):
+        self.capacity = capacity
+        self.file_path = file_path
+        size = HEADER.size + capacity * SAMPLE_SIZE
+
+        if file_path is None:
+            self.buffer = bytearray(size)
+            self.head, self.count = 0, 0
+        else:
+            self.buffer = self.open_mapped(file_path, size)
+            magic, stored_capacity, self.head, self.count = HEADER.unpack_from(self.buffer)
+            if magic != MAGIC or stored_capacity != capacity:
+                self.head, self.count = 0, 0  # New or incompatible file; start empty
+
+        view = memoryview(self.buffer)
+        offset = HEADER.size
+        self.timestamps = view[offset:offset + capacity * 8].cast('d')
+        offset += capacity * 8
+        self.players = view[offset:offset + capacity * 4].cast('i')
+        offset += capacity * 4
+        self.max_players = view[offset:offset + capacity * 4].cast('i')
+        offset += capacity * 4
+        self.online = view[offset:offset + capacity]
+        self.write_header()
+
+    @staticmethod
+    def open_mapped(file_path, size):
+        fd = os.open(file_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size != size:
+                os.ftruncate(fd, size)
+            return mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+    def write_header(self):
+        HEADER.pack_into(self.buffer, 0, MAGIC, self.capacity, self.head, self.count)
+
+    def append(self, players, max_players, online, timestamp=None):
+        """Record one poll result, overwriting the oldest sample once full."""
+        index = self.head
+        self.timestamps[index] = time.time() if timestamp is None else timestamp
+        self.players[index] = players
+        self.max_players[index] = max_players
+        self.online[index] = 1 if online else 0
+        self.head = (index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.write_header()
+
+    def segments(self, since):
+        """Slices (start, stop) of the ring, oldest first, holding samples taken at or after since."""
+        if self.count < self.capacity:
+            ranges = [(0, self.count)]
+        else:
+            ranges = [(self.head, self.capacity), (0, self.head)]
+
+        # Timestamps are ascending within each range, so the window start is a bisect away
+        result = []
+        for start, stop in ranges:
+            first = bisect.bisect_left(self.timestamps, since, start, stop)
+            if first < stop:
+                result.append((first, stop))
+        return result
+
+    def stats(self, window_seconds, max_gap=MAX_SAMPLE_GAP):
+        """Peak, average and uptime over the last window_seconds, or None without samples.
+
+        The poller samples at an adaptive rate (often while things change, rarely
+        while they don't), so average and uptime weight each sample by the time
+        until the next one, capped at max_gap seconds. 'span' is how many seconds
+        of the window the history actually covers: less than window_seconds when
+        the ring holds nothing older than the window start.
+        """
+        now = time.time()
+        since = now - window_seconds
+        segments = self.segments(since)
+        samples = sum(stop - start for start, stop in segments)
+        if not samples:
+            return None
+
+        # Peaks are reductions in C over zero-copy slices of the column views
+        peak = max(max(self.players[start:stop]) for start, stop in segments)
+        max_players = max(max(self.max_players[start:stop]) for start, stop in segments)
+
+        timestamps = list(itertools.chain.from_iterable(self.timestamps[start:stop] for start, stop in segments))
+        players = itertools.chain.from_iterable(self.players[start:stop] for start, stop in segments)
+        online = itertools.chain.from_iterable(self.online[start:stop] for start, stop in segments)
+        # Gaps to the next sample (the last one runs until now), clamped to [0, max_gap] by map in C
+        ends = itertools.chain(itertools.islice(timestamps, 1, None), (now,))
+        gaps = map(max, map(operator.sub, ends, timestamps), itertools.repeat(0.0))
+        weights = list(map(min, gaps, itertools.repeat(max_gap)))
+        total_weight = sum(weights)
+        if not total_weight:
+            weights, total_weight = [1.0] * samples, samples  # Only samples taken just now
+        oldest = self.timestamps[self.head if self.count == self.capacity else 0]
+        return {
+            'samples': samples,
+            'span': window_seconds if oldest < since else now - timestamps[0],
+            'peak': peak,
+            'max_players': max_players,
+            'average': sum(map(operator.mul, weights, players)) / total_weight,
+            'uptime': sum(map(operator.mul, weights, online)) / total_weight
+        }
+
+    def close(self):
+        """Flush and release a memory-mapped history."""
+        for view in (self.timestamps, self.players, self.max_players, self.online):
+            view.release()
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.flush()
+            self.buffer.close()
+
+
+class PresenceRenderer:
+    """Render presence text from a bot config's pop_message template and player tiers."""
+
+    def __init__(self, bot_config):
+        self.pop_message = bot_config.pop_message
+        self.offline_message = bot_config.connecting_message
+
+        # Precompute player count -> tier message so rendering is a single list index
+        top = max((high for _, high, _ in bot_config.player_tiers), default=-1)
+        self.tier_lookup = [None] * (top + 1)
+        for low, high, message in bot_config.player_tiers:
+            for count in range(low, high + 1):
+                if self.tier_lookup[count] is None:
+                    self.tier_lookup[count] = message
+
+    def render(self, players, max_players, online):
+        if not online:
+            return self.offline_message
+        text = self.pop_message.format(players=players, maxplayers=max_players, queue=0, joining=0)
+        tier = self.tier_lookup[players] if players < len(self.tier_lookup) else None
+        return f"{text} | {tier}" if tier else text
@@ -0,0 +1,106 @@
+import asyncio
+import random
+
+
+class PollJob:
+    __slots__ = ('name', 'callback', 'base_interval', 'min_interval', 'max_interval', 'interval', 'next_due', 'last_run')
+
+    def __init__(self, name, callback, base_interval, min_interval, max_interval, next_due):
+        self.name = name
+        self.callback = callback
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = base_interval
+        self.next_due = next_due
+        self.last_run = float('-inf')  # Loop time the callback last finished
+
+
+class PollScheduler:
+    """Run one bot's periodic jobs from a single task with adaptive intervals.
+
+    A job's callback returns True when the state it watches changed. The job is
+    then polled again at its minimum interval, and each run without a change
+    doubles the interval up to its maximum. Every delay gets random jitter so
+    bots don't poll in lockstep. Triggers never run a job sooner than its
+    minimum interval after its last run; only the wakeup forces every job.
+    """
+
+    def __init__(self, wakeup=None, backoff=2.0, jitter=0.1, on_wakeup=None):
+        self.jobs = {}  # name -> PollJob
+        self.wakeup = wakeup or asyncio.Event()  # Setting it makes every job due; cleared once handled
+        self.on_wakeup = on_wakeup  # Called when the wakeup is handled, before the jobs run
+        self.triggered = asyncio.Event()
+        self.backoff = backoff
+        self.jitter = jitter
+
+    def add_job(self, name, callback, base_interval, min_interval=None, max_interval=None, initial_delay=0):
+        """Schedule callback every base_interval seconds, adapting between min_interval and max_interval."""
+        loop = asyncio.get_running_loop()
+        self.jobs[name] = PollJob(
+            name,
+            callback,
+            base_interval,
+            min_interval if min_interval is not None else base_interval / 4,
+            max_interval if max_interval is not None else base_interval * 8,
+            loop.time() + initial_delay
+        )
+
+    def set_base_interval(self, name, base_interval):
+        """Change a job's base interval, scaling its minimum and maximum with it."""
+        job = self.jobs[name]
+        scale = base_interval / job.base_interval
+        job.base_interval = base_interval
+        job.min_interval *= scale
+        job.max_interval *= scale
+        job.interval = min(max(job.interval, job.min_interval), job.max_interval)
+
+    def trigger(self, *names):
+        """Make the named jobs (or all jobs) run as soon as their minimum interval allows."""
+        now = asyncio.get_running_loop().time()
+        for name in names or self.jobs:
+            job = self.jobs.get(name)
+            if job is not None:
+                job.next_due = min(job.next_due, max(now, job.last_run + job.min_interval))
+        self.triggered.set()
+
+    def reschedule(self, job, changed, now):
+        if changed:
+            job.interval = job.min_interval
+        else:
+            job.interval = min(job.interval * self.backoff, job.max_interval)
+        job.next_due = now + job.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    async def run(self):
+        """Run due jobs forever, sleeping until the next one is due or a wakeup arrives."""
+        loop = asyncio.get_running_loop()
+        while True:
+            if self.wakeup.is_set():
+                self.wakeup.clear()
+                if self.on_wakeup is not None:
+                    self.on_wakeup()
+                for job in self.jobs.values():
+                    job.next_due = loop.time()  # A reloaded config is published right away
+
+            now = loop.time()
+            for job in sorted(self.jobs.values(), key=lambda job: job.next_due):
+                if job.next_due > now:
+                    break
+                try:
+                    changed = await job.callback()
+                except Exception as e:
+                    print(f"Error during {job.name} update: {e}")
+                    changed = False
+                job.last_run = loop.time()
+                self.reschedule(job, changed, job.last_run)
+
+            self.triggered.clear()
+            if not self.jobs:
+                return
+            delay = max(0, min(job.next_due for job in self.jobs.values()) - loop.time())
+            wakeups = [asyncio.ensure_future(self.wakeup.wait()), asyncio.ensure_future(self.triggered.wait())]
+            try:
+                await asyncio.wait(wakeups, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for waiter in wakeups:
+                    waiter.cancel()
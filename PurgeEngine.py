@@ -0,0 +1,122 @@
+import asyncio
+import datetime
+import logging
+import discord
+from OutboundQueue import outbound_queue
+from Metrics import metrics
+
+BULK_DELETE_MAX_AGE = datetime.timedelta(days=14, minutes=-5)  # Margin for clock skew
+BULK_DELETE_BATCH = 100
+
+
+class PurgeEngine:
+    """Run the !lifxclean* purges as cancellable background jobs, one per guild."""
+
+    def __init__(self, concurrency=3, progress_interval=15, bot_name='default'):
+        self.bot_name = bot_name  # Metrics label
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.progress_interval = progress_interval
+        self.jobs = {}  # guild_id -> job task
+
+    def start(self, message, channels, check=None, description="messages"):
+        """Start purging the channels in the background. Returns False if a purge is already running."""
+        guild_id = message.guild.id
+        if guild_id in self.jobs:
+            return False
+        job = self.jobs[guild_id] = asyncio.ensure_future(self.run_job(message.channel, guild_id, channels, check, description))
+        # Removed however the job ends, even if it died sending its acknowledgement
+        job.add_done_callback(lambda job: self.finish_job(guild_id, job))
+        return True
+
+    def finish_job(self, guild_id, job):
+        if self.jobs.get(guild_id) is job:
+            del self.jobs[guild_id]
+        if not job.cancelled() and job.exception() is not None:
+            logging.error(f"Purge in guild {guild_id} failed: {job.exception()}")
+
+    def cancel(self, guild_id):
+        """Cancel the guild's running purge. Returns False if there was none."""
+        job = self.jobs.get(guild_id)
+        if job is None:
+            return False
+        job.cancel()
+        return True
+
+    def cancel_all(self):
+        """Cancel every running purge, e.g. when the bot's client shuts down."""
+        for job in list(self.jobs.values()):
+            job.cancel()
+
+    async def run_job(self, report_channel, guild_id, channels, check, description):
+        """Purge every channel concurrently, reporting progress and a final summary."""
+        progress = {'deleted': 0, 'channels_done': 0, 'failed': []}
+        total_channels = len(channels)
+        ack = await outbound_queue.send(report_channel, f"Purging {description} in {total_channels} channel(s)... use !lifxcancelpurge to stop.", dedupe=False, bot=self.bot_name)
+        reporter = asyncio.ensure_future(self.report_progress(report_channel, ack, progress, total_channels))
+        cancelled = False
+
+        def keep_ack(message):
+            return message.id != ack.id and (check is None or check(message))
+
+        try:
+            await asyncio.gather(*[self.purge_channel(channel, keep_ack, progress) for channel in channels])
+        except asyncio.CancelledError:
+            cancelled = True
+        finally:
+            reporter.cancel()
+
+        summary = (
+            f"Purge {'cancelled' if cancelled else 'finished'}: deleted {progress['deleted']} {description} "
+            f"in {progress['channels_done']}/{total_channels} channel(s)."
+        )
+        if progress['failed']:
+            summary += f" Failed in: {', '.join(progress['failed'])}."
+        logging.info(summary)
+        try:
+            # The report channel itself may have been purged, so send rather than edit
+            await outbound_queue.send(report_channel, summary, dedupe=False, bot=self.bot_name)
+        except discord.HTTPException as e:
+            logging.error(f"Failed to send purge summary: {e}")
+
+    async def report_progress(self, report_channel, ack, progress, total_channels):
+        """Edit the acknowledgement message with the running totals."""
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            content = f"Purging... {progress['deleted']} deleted, {progress['channels_done']}/{total_channels} channel(s) done."
+            try:
+                await outbound_queue.submit(report_channel, lambda: ack.edit(content=content), bot=self.bot_name)
+            except discord.NotFound:
+                return  # The acknowledgement was purged with the channel
+            except discord.HTTPException as e:
+                logging.warning(f"Failed to update purge progress: {e}")
+
+    async def purge_channel(self, channel, check, progress):
+        """Bulk delete recent matching messages in batches of 100 and older ones individually."""
+        async with self.semaphore:
+            try:
+                batch = []
+                async for message in channel.history(limit=None):
+                    if not check(message):
+                        continue
+                    if datetime.datetime.utcnow() - message.created_at < BULK_DELETE_MAX_AGE:
+                        batch.append(message)
+                        if len(batch) == BULK_DELETE_BATCH:
+                            with metrics.timer('lifx_discord_request_seconds', kind='bulk_delete', bot=self.bot_name):
+                                await channel.delete_messages(batch)
+                            progress['deleted'] += len(batch)
+                            batch = []
+                    else:
+                        try:
+                            with metrics.timer('lifx_discord_request_seconds', kind='delete', bot=self.bot_name):
+                                await message.delete()
+                            progress['deleted'] += 1
+                        except discord.NotFound:
+                            pass
+                if batch:
+                    with metrics.timer('lifx_discord_request_seconds', kind='bulk_delete', bot=self.bot_name):
+                        await channel.delete_messages(batch)
+                    progress['deleted'] += len(batch)
+                progress['channels_done'] += 1
+            except discord.HTTPException as e:
+                progress['failed'].append(channel.name)
+                logging.error(f"Failed to purge channel {channel.name}: {e}")
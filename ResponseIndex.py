@@ -0,0 +1,71 @@
+TERMINAL = ''  # Trie slot holding (order, key) for a key ending at that node
+
+
+def is_word_char(char):
+    """Match the regex definition of a \\w character."""
+    return char.isalnum() or char == '_'
+
+
+class ResponseIndex:
+    """Keyword index over a responses dict, built once per loaded file.
+
+    Keys are stored lowercased in a character trie. A key matches the same way
+    re.search(r'\\b' + re.escape(key) + r'\\b', text) would: it must start and end
+    on a word boundary of the text. When several keys match, the one appearing
+    first in the responses file wins.
+    """
+
+    def __init__(self, responses):
+        self.root = {}
+        for order, (key, value) in enumerate(responses.items()):
+            if not isinstance(value, (list, tuple)) or not value:
+                continue  # get_response skips keys without usable responses
+            node = self.root
+            for char in key.lower():
+                node = node.setdefault(char, {})
+            if TERMINAL not in node:
+                node[TERMINAL] = (order, key)
+
+    def state(self):
+        """Plain, marshal-able form of the index for response packs."""
+        return self.root
+
+    @classmethod
+    def from_state(cls, root):
+        index = cls.__new__(cls)
+        index.root = root
+        return index
+
+    def search(self, text):
+        """Return the first key (in file order) found as a whole word in text, or None."""
+        root = self.root
+        length = len(text)
+        best = None
+        previous_is_word = False
+
+        for start in range(length + 1):
+            current_is_word = start < length and is_word_char(text[start])
+            if current_is_word == previous_is_word:
+                previous_is_word = current_is_word
+                continue  # Keys can only start on a word boundary
+            previous_is_word = current_is_word
+
+            node = root
+            position = start
+            while True:
+                terminal = node.get(TERMINAL)
+                if terminal is not None and (best is None or terminal[0] < best[0]):
+                    before = is_word_char(text[position - 1]) if position else False
+                    after = is_word_char(text[position]) if position < length else False
+                    if before != after:
+                        best = terminal
+                        if best[0] == 0:
+                            return best[1]
+                if position == length:
+                    break
+                node = node.get(text[position])
+                if node is None:
+                    break
+                position += 1
+
+        return best[1] if best else None
@@ -0,0 +1,71 @@
+import glob
+import marshal
+import os
+import struct
+import sys
+
+PACK_MAGIC = b'LXRP'
+PACK_VERSION = 1
+PACK_DIR = '__packcache__'
+# magic, pack version, Python major/minor (marshal format), source mtime_ns, source size
+PACK_HEADER = struct.Struct('<4sHBBqq')
+RESPONSE_FILE_PATTERNS = ('responses.json', os.path.join('GameRelatedResponses', '*.json'), os.path.join('modding', '*.json'))
+
+
+def pack_path(file_path):
+    """Location of the compiled pack for a responses file, next to it like __pycache__."""
+    directory, filename = os.path.split(file_path)
+    return os.path.join(directory, PACK_DIR, os.path.splitext(filename)[0] + '.pack')
+
+
+def read_pack(file_path, source_stat):
+    """Return the packed response set state, or None if the pack is missing or stale."""
+    try:
+        with open(pack_path(file_path), 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    if len(data) < PACK_HEADER.size:
+        return None
+    magic, version, major, minor, mtime, size = PACK_HEADER.unpack_from(data)
+    if (magic, version, major, minor, mtime, size) != (
+        PACK_MAGIC, PACK_VERSION, sys.version_info[0], sys.version_info[1], source_stat.st_mtime_ns, source_stat.st_size
+    ):
+        return None
+
+    try:
+        return marshal.loads(memoryview(data)[PACK_HEADER.size:])
+    except (EOFError, ValueError, TypeError):
+        return None
+
+
+def write_pack(file_path, source_stat, state):
+    """Write the response set state to its pack, atomically."""
+    path = pack_path(file_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    header = PACK_HEADER.pack(
+        PACK_MAGIC, PACK_VERSION, sys.version_info[0], sys.version_info[1], source_stat.st_mtime_ns, source_stat.st_size
+    )
+    temp_path = f"{path}.{os.getpid()}.tmp"  # Worker processes may compile the same pack at once
+    with open(temp_path, 'wb') as f:
+        f.write(header)
+        f.write(marshal.dumps(state))
+    os.replace(temp_path, path)
+
+
+def response_files():
+    """Every responses file shipped with the bot."""
+    paths = []
+    for pattern in RESPONSE_FILE_PATTERNS:
+        paths.extend(sorted(glob.glob(pattern)))
+    return paths
+
+
+if __name__ == "__main__":
+    # Build step: compile every responses file into its pack ahead of start-up
+    from ResponseStore import response_store
+
+    for file_path in response_files():
+        response_store.load(file_path, use_pack=False)  # Parses the JSON and rewrites the pack
+        print(f"Compiled {file_path} -> {pack_path(os.path.normpath(file_path))}")
@@ -0,0 +1,74 @@
+import collections
+import json
+import logging
+import os
+
+# A field set to None inherits from the wider scope (channel -> guild -> default),
+# except that a guild's enabled=False switches the chatbot off in all its channels
+Profile = collections.namedtuple('Profile', ['responses_file_path', 'enabled'])
+
+
+class ResponseProfiles:
+    """Per-guild and per-channel chat profiles: which response pack is active and whether the chatbot is on.
+
+    The profile dicts are never mutated; every change builds a new dict and swaps
+    the reference, so handlers reading a snapshot always see a consistent mapping.
+    """
+
+    def __init__(self, state_file_path, default=Profile('responses.json', True)):
+        self.state_file_path = state_file_path
+        self.default = default
+        self.guild_profiles = {}  # guild_id -> Profile
+        self.channel_profiles = {}  # channel_id -> Profile
+        self.load_state()
+
+    def resolve(self, guild_id, channel_id):
+        """Return the effective Profile for a channel in O(1)."""
+        channel_profile = self.channel_profiles.get(channel_id)
+        guild_profile = self.guild_profiles.get(guild_id)
+        responses_file_path, enabled = self.default
+        for profile in (guild_profile, channel_profile):
+            if profile is not None:
+                if profile.responses_file_path is not None:
+                    responses_file_path = profile.responses_file_path
+                if profile.enabled is not None:
+                    enabled = profile.enabled
+        if guild_profile is not None and guild_profile.enabled is False:
+            enabled = False  # Server-wide kill switch
+        return Profile(responses_file_path, enabled)
+
+    def update_guild(self, guild_id, **fields):
+        """Change fields of a guild's profile with a copy-on-write swap."""
+        profile = self.guild_profiles.get(guild_id, Profile(None, None))._replace(**fields)
+        self.guild_profiles = {**self.guild_profiles, guild_id: profile}
+        self.save_state()
+
+    def update_channel(self, channel_id, **fields):
+        """Change fields of a channel's profile with a copy-on-write swap."""
+        profile = self.channel_profiles.get(channel_id, Profile(None, None))._replace(**fields)
+        self.channel_profiles = {**self.channel_profiles, channel_id: profile}
+        self.save_state()
+
+    def load_state(self):
+        """Load the profiles persisted by a previous run."""
+        try:
+            with open(self.state_file_path, 'r') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return
+        except json.JSONDecodeError as e:
+            logging.error(f"Could not read chat profiles from {self.state_file_path}: {e}")
+            return
+        self.guild_profiles = {int(scope_id): Profile(*fields) for scope_id, fields in state.get('guilds', {}).items()}
+        self.channel_profiles = {int(scope_id): Profile(*fields) for scope_id, fields in state.get('channels', {}).items()}
+
+    def save_state(self):
+        """Persist the profiles compactly as {"guilds": {id: [path, enabled]}, "channels": {...}}."""
+        state = {
+            'guilds': {str(scope_id): list(profile) for scope_id, profile in self.guild_profiles.items()},
+            'channels': {str(scope_id): list(profile) for scope_id, profile in self.channel_profiles.items()}
+        }
+        temp_path = self.state_file_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(state, f, separators=(',', ':'))
+        os.replace(temp_path, self.state_file_path)
@@ -0,0 +1,101 @@
+import json
+import logging
+import os
+import sys
+from types import MappingProxyType
+from ResponseIndex import ResponseIndex
+from FuzzyIndex import FuzzyIndex
+from ResponsePack import read_pack, write_pack
+
+
+class ResponseSet:
+    """Immutable, indexed view of one responses file."""
+
+    __slots__ = ('file_path', 'mtime', 'responses', 'keyword_index', 'fuzzy_index')
+
+    def __init__(self, file_path, mtime, responses):
+        self.file_path = file_path
+        self.mtime = mtime
+        # Keys are interned and response lists frozen to tuples; entries without
+        # usable responses are dropped since get_response could never return them.
+        self.responses = MappingProxyType({
+            sys.intern(key): tuple(value)
+            for key, value in responses.items()
+            if isinstance(value, list) and value
+        })
+        self.keyword_index = ResponseIndex(self.responses)
+        self.fuzzy_index = FuzzyIndex(self.responses)
+
+    def state(self):
+        """Plain, marshal-able form of the set, including its prebuilt indexes."""
+        return (tuple(self.responses.items()), self.keyword_index.state(), self.fuzzy_index.state())
+
+    @classmethod
+    def from_state(cls, file_path, mtime, state):
+        """Rebuild a set from a response pack without re-indexing."""
+        items, keyword_state, fuzzy_state = state
+        response_set = cls.__new__(cls)
+        response_set.file_path = file_path
+        response_set.mtime = mtime
+        response_set.responses = MappingProxyType({sys.intern(key): responses for key, responses in items})
+        response_set.keyword_index = ResponseIndex.from_state(keyword_state)
+        response_set.fuzzy_index = FuzzyIndex.from_state(fuzzy_state)
+        return response_set
+
+    def __bool__(self):
+        return bool(self.responses)
+
+
+EMPTY_RESPONSE_SET = ResponseSet(None, None, {})
+
+
+class ResponseStore:
+    """Process-wide registry of response sets, loaded once per file path and mtime."""
+
+    def __init__(self):
+        self.response_sets = {}  # normalised file path -> ResponseSet
+
+    def load(self, file_path, use_pack=True):
+        """Return the response set for file_path, parsing the file only if it changed on disk.
+
+        A fresh compiled pack (see ResponsePack) is used instead of the JSON when there is one;
+        otherwise the JSON is parsed and the pack rewritten for the next start-up.
+        """
+        file_path = os.path.normpath(file_path)
+        try:
+            source_stat = os.stat(file_path)
+        except FileNotFoundError as e:
+            logging.error(f"Could not find responses file: {e}")
+            return None
+        mtime = source_stat.st_mtime_ns
+
+        response_set = self.response_sets.get(file_path)
+        if use_pack and response_set is not None and response_set.mtime == mtime:
+            return response_set
+
+        state = read_pack(file_path, source_stat) if use_pack else None
+        if state is not None:
+            response_set = ResponseSet.from_state(file_path, mtime, state)
+            logging.info(f"Loaded responses from pack for {file_path}")
+        else:
+            with open(file_path, 'r') as f:
+                responses = json.load(f)
+            response_set = ResponseSet(file_path, mtime, responses)
+            logging.info(f"Loaded responses from {file_path}")
+            try:
+                write_pack(file_path, source_stat, response_set.state())
+            except OSError as e:
+                logging.warning(f"Could not write response pack for {file_path}: {e}")
+
+        self.response_sets[file_path] = response_set
+        return response_set
+
+    def get(self, file_path):
+        """Return the cached response set for file_path, loading it on first use."""
+        response_set = self.response_sets.get(file_path)
+        if response_set is None:
+            response_set = self.load(file_path) or EMPTY_RESPONSE_SET
+        return response_set
+
+
+response_store = ResponseStore()  # Shared by every bot in the process
@@ -0,0 +1,90 @@
+import discord
+
+EMBED_FIELD_LIMIT = 1024  # Discord's maximum length of a field value
+MORE_PLAYERS_LINE = "...and {} more"
+
+
+def format_duration(seconds):
+    """Session length at minute granularity, e.g. '2h 05m' or '12m'."""
+    minutes = int(seconds // 60)
+    if minutes < 60:
+        return f"{minutes}m"
+    return f"{minutes // 60}h {minutes % 60:02d}m"
+
+
+def format_player_list(players):
+    """One line per player, longest session first, cut to fit a single embed field."""
+    if not players:
+        return "Nobody online"
+    lines = []
+    length = 0
+    ordered = sorted(players, key=lambda player: -player[2])
+    for shown, (name, score, duration) in enumerate(ordered):
+        line = f"{discord.utils.escape_markdown(name)} ({format_duration(duration)})"
+        # Always leave room for the "...and N more" line
+        if length + len(line) + len(MORE_PLAYERS_LINE) + 8 > EMBED_FIELD_LIMIT:
+            lines.append(MORE_PLAYERS_LINE.format(len(ordered) - shown))
+            break
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)
+
+
+def server_info_fields(bot_config, snapshot, details):
+    """The (name, value, inline) fields of the server information embed, in display order."""
+    players_online, max_players, server_online = snapshot
+    fields = [
+        ("Server Name", bot_config.server_name, False),
+        ("Players Online", f"{players_online}/{max_players}", False),
+        ("Server IP", bot_config.server_ip, True),
+        ("Connect Port", bot_config.server_port, True),
+        ("Query Port", bot_config.query_port, True),
+        ("Last Wipe Date", bot_config.last_wipe, True),
+        ("Next Planned Wipe Date", bot_config.next_wipe, True),
+        ("Live Map", bot_config.livemap, False)
+    ]
+    if server_online and details.map_name:
+        fields.append(("Map", details.map_name, True))
+    if server_online and bot_config.show_players and details.players is not None:
+        fields.append(("Players", format_player_list(details.players), False))
+    if server_online and details.rules is not None:
+        for rule in bot_config.show_rules:
+            fields.append((rule, details.rules.get(rule, 'N/A'), True))
+    return [(name, str(value), inline) for name, value, inline in fields]
+
+
+class ServerInfoEmbed:
+    """The server information embed, kept between updates so only fields whose text changed are redrawn."""
+
+    def __init__(self, title="Server Information", color=0x00FF00):
+        self.embed = discord.Embed(title=title, color=color)
+        self.fields = []  # (name, value, inline) currently on the embed
+        self.image_url = None
+
+    def invalidate(self):
+        """Forget what is on the embed, so the next render counts as a change."""
+        self.fields = []
+        self.image_url = None
+
+    def render(self, fields, image_url=None):
+        """Bring the embed up to date with the fields. Returns whether anything changed."""
+        changed = False
+        if [field[0] for field in fields] != [field[0] for field in self.fields]:
+            # Fields were added, removed or reordered: lay the embed out again
+            self.embed.clear_fields()
+            for name, value, inline in fields:
+                self.embed.add_field(name=name, value=value, inline=inline)
+            changed = True
+        else:
+            for index, (field, current) in enumerate(zip(fields, self.fields)):
+                if field != current:
+                    name, value, inline = field
+                    self.embed.set_field_at(index, name=name, value=value, inline=inline)
+                    changed = True
+        self.fields = list(fields)
+
+        if image_url != self.image_url:
+            self.embed.set_image(url=image_url or discord.Embed.Empty)
+            self.image_url = image_url
+            changed = True
+        return changed
@@ -0,0 +1,117 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+import queue
+import time
+import bot
+
+# A worker that stayed up this many seconds before exiting is restarted without backoff
+STABLE_UPTIME = 600
+
+
+def run_worker(worker_index, worker_count, status_queue, startup_delay, metrics_port=None, message_log_sample_rate=1.0):
+    """Entry point of a worker process: run this worker's shard of the Bots/ configs."""
+    time.sleep(startup_delay)
+    asyncio.run(bot.main(worker_index, worker_count, status_queue, metrics_port, message_log_sample_rate))
+
+
+class Supervisor:
+    """Shard bot configs across worker processes, restart crashed workers and log their combined health."""
+
+    def __init__(self, worker_count=None, startup_stagger=5, status_interval=60, metrics_port=None, message_log_sample_rate=1.0):
+        self.worker_count = worker_count or os.cpu_count() or 1
+        self.startup_stagger = startup_stagger
+        self.status_interval = status_interval
+        self.metrics_port = metrics_port  # Worker N serves its metrics on metrics_port + N
+        self.message_log_sample_rate = message_log_sample_rate
+        self.context = multiprocessing.get_context('spawn')
+        self.status_queue = self.context.Queue()
+        self.workers = {}  # worker_index -> Process
+        self.restarts = {}  # worker_index -> restart count
+        self.crash_streaks = {}  # worker_index -> restarts since the worker last stayed up STABLE_UPTIME
+        self.started_at = {}  # worker_index -> monotonic time the worker's startup delay ends
+        self.worker_status = {}  # worker_index -> last status report
+
+    def start_worker(self, worker_index, startup_delay):
+        """Start (or restart) one worker process."""
+        process = self.context.Process(
+            target=run_worker,
+            args=(worker_index, self.worker_count, self.status_queue, startup_delay, self.metrics_port, self.message_log_sample_rate),
+            name=f"bot-worker-{worker_index}",
+            daemon=True
+        )
+        process.start()
+        self.workers[worker_index] = process
+        self.started_at[worker_index] = time.monotonic() + startup_delay
+        print(f"Supervisor | Started worker {worker_index} (pid {process.pid}).")
+
+    def restart_crashed_workers(self):
+        """Restart dead workers, backing off when a worker keeps crashing."""
+        for worker_index, process in list(self.workers.items()):
+            if process.is_alive():
+                continue
+            restarts = self.restarts.get(worker_index, 0) + 1
+            self.restarts[worker_index] = restarts
+            if time.monotonic() - self.started_at[worker_index] >= STABLE_UPTIME:
+                self.crash_streaks[worker_index] = 0  # Crashes days apart shouldn't add up to the full backoff
+            streak = self.crash_streaks.get(worker_index, 0) + 1
+            self.crash_streaks[worker_index] = streak
+            self.worker_status.pop(worker_index, None)
+            print(f"Supervisor | Worker {worker_index} exited with code {process.exitcode}, restarting (restart #{restarts}).")
+            self.start_worker(worker_index, min(60, 2 ** streak))
+
+    def report(self):
+        """Log one combined health line for all workers."""
+        alive = sum(1 for process in self.workers.values() if process.is_alive())
+        bots = sum(status['bots'] for status in self.worker_status.values())
+        running = sum(status['running'] for status in self.worker_status.values())
+        crashed = [name for status in self.worker_status.values() for name in status['crashed']]
+        max_lag = max((status['loop_lag'] for status in self.worker_status.values()), default=0)
+        queue_depth = sum(status['queue_depth'] for status in self.worker_status.values())
+        rate_limited = sum(status['rate_limited'] for status in self.worker_status.values())
+        print(
+            f"Supervisor | workers {alive}/{self.worker_count} alive, bots {running}/{bots} running, "
+            f"max loop lag {max_lag}s, queued messages {queue_depth}, 429s {rate_limited}, "
+            f"restarts {sum(self.restarts.values())}"
+            + (f", crashed bots: {', '.join(crashed)}" if crashed else "")
+        )
+
+    def run(self):
+        """Start every worker with staggered start-up, then supervise them forever."""
+        for worker_index in range(self.worker_count):
+            self.start_worker(worker_index, worker_index * self.startup_stagger)
+
+        last_report = time.monotonic()
+        try:
+            while True:
+                try:
+                    status = self.status_queue.get(timeout=1)
+                    self.worker_status[status['worker']] = status
+                except queue.Empty:
+                    pass
+
+                self.restart_crashed_workers()
+
+                if time.monotonic() - last_report >= self.status_interval:
+                    self.report()
+                    last_report = time.monotonic()
+        except KeyboardInterrupt:
+            print("Supervisor | Shutting down workers.")
+        finally:
+            for process in self.workers.values():
+                process.terminate()
+            for process in self.workers.values():
+                process.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Bots/ configs across several worker processes.")
+    parser.add_argument('--workers', type=int, default=None, help="Number of worker processes (default: CPU count).")
+    parser.add_argument('--startup-stagger', type=float, default=5, help="Seconds between worker start-ups.")
+    parser.add_argument('--status-interval', type=float, default=60, help="Seconds between combined status lines.")
+    parser.add_argument('--metrics-port', type=int, default=None, help="Base port for the workers' local /metrics endpoints.")
+    parser.add_argument('--message-log-sample-rate', type=float, default=1.0, help="Fraction of per-message chat log lines to keep.")
+    args = parser.parse_args()
+
+    Supervisor(args.workers, args.startup_stagger, args.status_interval, args.metrics_port, args.message_log_sample_rate).run()
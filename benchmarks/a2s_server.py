@@ -0,0 +1,105 @@
+import asyncio
+import random
+import struct
+import time
+
+A2S_HEADER = b'\xff\xff\xff\xff'
+A2S_INFO_REQUEST = 0x54
+A2S_INFO_RESPONSE = b'I'
+A2S_PLAYER_REQUEST = 0x55
+A2S_PLAYER_RESPONSE = b'D'
+A2S_RULES_REQUEST = 0x56
+A2S_RULES_RESPONSE = b'E'
+A2S_CHALLENGE_RESPONSE = b'A'
+
+
+class A2SResponder(asyncio.DatagramProtocol):
+    """Local stand-in for a game server answering A2S_INFO, A2S_PLAYER and A2S_RULES queries.
+
+    latency delays each reply, loss drops that fraction of requests, and
+    player_churn is the chance the player count moves by one between queries.
+    Player and rules queries need a challenge number first, like real servers.
+    """
+
+    def __init__(self, name="Benchmark Server", players=10, max_players=64, latency=0.0, loss=0.0, player_churn=0.0, rules=None):
+        self.name = name
+        self.players = players
+        self.max_players = max_players
+        self.rules = rules if rules is not None else {'version': '1.0', 'pvp': 'true', 'wipe': 'weekly'}
+        self.challenge = random.getrandbits(31)
+        self.started = time.monotonic()
+        self.latency = latency
+        self.loss = loss
+        self.player_churn = player_churn
+        self.requests = 0
+        self.dropped = 0
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.requests += 1
+        if random.random() < self.loss:
+            self.dropped += 1
+            return
+        if data[:4] != A2S_HEADER or len(data) < 5:
+            return
+
+        if data[4] == A2S_INFO_REQUEST:
+            reply = self.info_reply()
+        elif data[4] in (A2S_PLAYER_REQUEST, A2S_RULES_REQUEST):
+            if data[5:9] != struct.pack('<l', self.challenge):
+                reply = A2S_HEADER + A2S_CHALLENGE_RESPONSE + struct.pack('<l', self.challenge)
+            elif data[4] == A2S_PLAYER_REQUEST:
+                reply = self.player_reply()
+            else:
+                reply = self.rules_reply()
+        else:
+            return
+
+        if self.latency:
+            asyncio.get_running_loop().call_later(self.latency, self.transport.sendto, reply, addr)
+        else:
+            self.transport.sendto(reply, addr)
+
+    def info_reply(self):
+        if self.player_churn and random.random() < self.player_churn:
+            self.players = max(0, min(self.max_players, self.players + random.choice((-1, 1))))
+        return b''.join([
+            A2S_HEADER, A2S_INFO_RESPONSE,
+            bytes([17]),  # Protocol version
+            self.name.encode() + b'\0', b'benchmark_map\0', b'benchmark\0', b'Benchmark\0',
+            struct.pack('<H', 0),  # App ID
+            bytes([self.players, self.max_players, 0]),  # Players, max players, bots
+            b'd', b'l', b'\0', b'\0',  # Dedicated, Linux, no password, no VAC
+            b'1.0\0',
+            b'\0'  # No extra data fields
+        ])
+
+    def player_reply(self):
+        # Sessions differ by a minute per player and grow with the responder's uptime
+        uptime = time.monotonic() - self.started
+        parts = [A2S_HEADER, A2S_PLAYER_RESPONSE, bytes([self.players])]
+        for index in range(self.players):
+            parts.append(bytes([index]) + f"player-{index}".encode() + b'\0' + struct.pack('<lf', index, uptime + 60 * index))
+        return b''.join(parts)
+
+    def rules_reply(self):
+        parts = [A2S_HEADER, A2S_RULES_RESPONSE, struct.pack('<H', len(self.rules))]
+        for key, value in self.rules.items():
+            parts.append(key.encode() + b'\0' + value.encode() + b'\0')
+        return b''.join(parts)
+
+
+async def start_responders(count, **options):
+    """Start count responders on free localhost ports, returning [(port, responder, transport)]."""
+    loop = asyncio.get_running_loop()
+    responders = []
+    for index in range(count):
+        transport, responder = await loop.create_datagram_endpoint(
+            lambda: A2SResponder(name=f"Benchmark Server {index}", **options),
+            local_addr=('127.0.0.1', 0)
+        )
+        responders.append((transport.get_extra_info('sockname')[1], responder, transport))
+    return responders
@@ -0,0 +1,181 @@
+import asyncio
+import collections
+import datetime
+import itertools
+import time
+import discord
+
+message_ids = itertools.count(1)
+
+
+class FakeResponse:
+    """Minimal aiohttp-like response so discord.HTTPException subclasses can be raised."""
+
+    def __init__(self, status, reason):
+        self.status = status
+        self.reason = reason
+
+
+class RestRecorder:
+    """Counts and times every REST call the fake layer serves."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.counts = collections.Counter()
+        self.timings = collections.defaultdict(list)
+
+    async def call(self, name):
+        started = time.perf_counter()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.counts[name] += 1
+        self.timings[name].append(time.perf_counter() - started)
+
+
+class FakeUser:
+    def __init__(self, user_id, name, bot=False):
+        self.id = user_id
+        self.name = name
+        self.bot = bot
+        self.guild_permissions = discord.Permissions.none()
+
+    def __str__(self):
+        return self.name
+
+
+class FakeMessage:
+    def __init__(self, channel, author, content=None, embed=None):
+        self.id = next(message_ids)
+        self.channel = channel
+        self.guild = channel.guild
+        self.author = author
+        self.content = content or ""
+        self.embeds = [embed] if embed is not None else []
+        self.created_at = datetime.datetime.utcnow()
+
+    async def edit(self, content=None, embed=None):
+        await self.channel.recorder.call('edit')
+        if content is not None:
+            self.content = content
+        if embed is not None:
+            self.embeds = [embed]
+        return self
+
+    async def delete(self):
+        await self.channel.recorder.call('delete')
+        self.channel.remove(self)
+
+
+class FakePartialMessage:
+    def __init__(self, channel, message_id):
+        self.channel = channel
+        self.id = message_id
+
+    async def edit(self, **fields):
+        message = self.channel.messages.get(self.id)
+        if message is None:
+            await self.channel.recorder.call('edit')
+            raise discord.NotFound(FakeResponse(404, 'Not Found'), 'Unknown Message')
+        return await message.edit(**fields)
+
+
+class FakeGuild:
+    def __init__(self, guild_id, me):
+        self.id = guild_id
+        self.name = f"guild-{guild_id}"
+        self.me = me
+        self.text_channels = []
+
+
+class FakeChannel:
+    """Text channel that keeps its messages in memory and records every REST call."""
+
+    def __init__(self, channel_id, guild, recorder):
+        self.id = channel_id
+        self.name = f"channel-{channel_id}"
+        self.guild = guild
+        self.recorder = recorder
+        self.messages = {}  # message_id -> FakeMessage, in send order
+        guild.text_channels.append(self)
+
+    def remove(self, message):
+        self.messages.pop(message.id, None)
+
+    async def send(self, content=None, embed=None):
+        await self.recorder.call('send')
+        message = FakeMessage(self, self.guild.me, content, embed)
+        self.messages[message.id] = message
+        return message
+
+    def get_partial_message(self, message_id):
+        return FakePartialMessage(self, message_id)
+
+    async def history(self, limit=100):
+        await self.recorder.call('history')
+        for message in list(reversed(self.messages.values()))[:limit]:
+            yield message
+
+    async def delete_messages(self, messages):
+        await self.recorder.call('bulk_delete')
+        for message in messages:
+            self.remove(message)
+
+
+class FakeClient:
+    """Stands in for discord.Client: fires on_ready on start and serves channels from the world."""
+
+    def __init__(self, world, **options):
+        self.world = world
+        self.user = FakeUser(next(message_ids), f"bot-{len(world.clients)}", bot=True)
+        self.loop = asyncio.get_event_loop()
+        self.events = {}
+        self.closed = asyncio.Event()
+        self.presence = None
+
+    def event(self, coroutine):
+        self.events[coroutine.__name__] = coroutine
+        return coroutine
+
+    def get_channel(self, channel_id):
+        return self.world.channels.get(channel_id)
+
+    async def start(self, token):
+        await self.events['on_ready']()
+        await self.closed.wait()
+
+    def is_closed(self):
+        return self.closed.is_set()
+
+    async def close(self):
+        self.closed.set()
+
+    async def change_presence(self, activity=None):
+        await self.world.recorder.call('presence')
+        self.presence = activity
+
+
+class FakeWorld:
+    """A fake Discord: guilds, channels and clients sharing one REST recorder."""
+
+    def __init__(self, rest_latency=0.0):
+        self.recorder = RestRecorder(rest_latency)
+        self.channels = {}
+        self.clients = []
+        self.channel_ids = itertools.count(1000)
+        self.bot_user = FakeUser(1, "benchmark-bot", bot=True)
+        self.guild = FakeGuild(1, self.bot_user)
+
+    def create_client(self, **options):
+        """Factory with discord.Client's signature, to patch in for discord.Client."""
+        client = FakeClient(self, **options)
+        self.clients.append(client)
+        return client
+
+    def create_channel(self):
+        channel = FakeChannel(next(self.channel_ids), self.guild, self.recorder)
+        self.channels[channel.id] = channel
+        return channel
+
+    def user_message(self, channel, content, author=None):
+        """A message from a (non-bot) user, as on_message would receive it."""
+        return FakeMessage(channel, author or FakeUser(2, "player"), content)
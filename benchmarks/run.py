@@ -0,0 +1,315 @@
+"""End-to-end load benchmark: local A2S servers, a fake Discord and a chat corpus replayer.
+
+Run from the repository root:
+
+    python -m benchmarks.run --bots 200 --servers 50 --duration 20 --chat-rate 2000
+
+Each scenario prints throughput, p50/p99 latency, event-loop lag and REST call
+counts. --json writes the results to a file, and the --max-* options exit non-zero
+when a budget is exceeded, so the run can gate performance regressions in CI.
+"""
+import argparse
+import asyncio
+import contextlib
+import glob
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from unittest import mock
+import discord
+import bot
+from LifxChatBot import LifxChatBot
+from OutboundQueue import outbound_queue
+from ConnectionPool import connection_pool
+from BotConfig import parse_bot_config
+from ResponseStore import response_store
+from benchmarks.a2s_server import start_responders
+from benchmarks.fake_discord import FakeWorld
+
+
+def percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def latency_summary(samples):
+    """p50/p99/max of a list of durations in seconds, reported in milliseconds."""
+    return {
+        'p50_ms': round(percentile(samples, 0.50) * 1000, 3),
+        'p99_ms': round(percentile(samples, 0.99) * 1000, 3),
+        'max_ms': round(max(samples, default=0) * 1000, 3)
+    }
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop wakes a task that sleeps for a fixed interval."""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.samples = []
+        self.task = None
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - started - self.interval))
+
+    def __enter__(self):
+        self.task = asyncio.ensure_future(self.run())
+        return self
+
+    def __exit__(self, *exc_info):
+        self.task.cancel()
+
+    def summary(self):
+        return latency_summary(self.samples)
+
+
+def build_chat_corpus(size, seed=0):
+    """Chat lines built from the GameRelatedResponses keys: exact keys, keys inside sentences, typos and noise."""
+    rng = random.Random(seed)
+    keys = []
+    for file_path in sorted(glob.glob(os.path.join('GameRelatedResponses', '*.json'))):
+        with open(file_path, 'r') as f:
+            keys.extend(json.load(f))
+    filler = ["hey", "guys", "lol", "so", "anyone", "know", "pls", "today", "the", "server", "ok", "thanks"]
+
+    def typo(text):
+        if len(text) < 4:
+            return text
+        position = rng.randrange(1, len(text) - 1)
+        return text[:position] + text[position + 1:]
+
+    corpus = []
+    for _ in range(size):
+        key = rng.choice(keys)
+        kind = rng.random()
+        if kind < 0.25:
+            corpus.append(key)
+        elif kind < 0.55:
+            corpus.append(" ".join(rng.sample(filler, 2) + [key] + rng.sample(filler, 2)))
+        elif kind < 0.7:
+            corpus.append(typo(key))
+        else:
+            corpus.append(" ".join(rng.choices(filler, k=rng.randint(2, 12))))
+    return corpus
+
+
+async def bench_a2s(args):
+    """Query every bot's server through the shared poller, round after round."""
+    responders = await start_responders(args.servers, latency=args.a2s_latency, loss=args.a2s_loss)
+    server_poller = bot.ServerPoller()
+    details = ('players', 'rules') if args.a2s_details else ()
+    addresses = [server_poller.register('127.0.0.1', responders[index % args.servers][0], details=details) for index in range(args.bots)]
+    timings = []
+    offline = 0
+
+    async def timed_refresh(address):
+        nonlocal offline
+        started = time.perf_counter()
+        _, _, online = await server_poller.refresh(address)
+        timings.append(time.perf_counter() - started)
+        offline += not online
+
+    with LoopLagMonitor() as lag:
+        started = time.perf_counter()
+        for _ in range(args.a2s_rounds):
+            await asyncio.gather(*[timed_refresh(address) for address in addresses])
+        elapsed = time.perf_counter() - started
+
+    for _, _, transport in responders:
+        transport.close()
+    return {
+        'refresh_calls': len(timings),
+        'udp_queries': sum(responder.requests for _, responder, _ in responders),
+        'offline_results': offline,
+        'refreshes_per_second': round(len(timings) / elapsed, 1),
+        'latency': latency_summary(timings),
+        'loop_lag': lag.summary()
+    }
+
+
+def bench_bot_config(index, port, channels, poll_interval, details=False):
+    return {
+        'bot_token': f"benchmark-{index}",
+        'webhooks': {
+            'server_information': {'channel_id': str(channels[0].id), 'enabled': True},
+            'server_status': {'channel_id': str(channels[1].id), 'enabled': True},
+            'server_rules': {'channel_id': str(channels[2].id), 'enabled': True}
+        },
+        'server_name': f"Benchmark {index}",
+        'server_ip': '127.0.0.1',
+        'server_port': str(port),
+        'query_port': str(port),
+        'update_interval': poll_interval,
+        'intervals': {'presence': poll_interval * 2, 'status': poll_interval * 5, 'information': poll_interval * 5, 'rules': poll_interval * 30},
+        'rules': ["Be nice", "No cheating"],
+        'show_players': details,
+        'show_rules': ['version', 'wipe'] if details else []
+    }
+
+
+async def bench_fleet(args, state_dir):
+    """Run the bots' scheduled loops against local A2S servers and a fake Discord."""
+    responders = await start_responders(args.servers, latency=args.a2s_latency, loss=args.a2s_loss, player_churn=args.player_churn)
+    world = FakeWorld(rest_latency=args.rest_latency)
+    connection_pool.login_interval = args.login_interval
+    fleet = bot.BotFleet(bot.MessageManager(os.path.join(state_dir, 'message_state.json')), bot.ServerPoller())
+
+    with mock.patch.object(discord, 'Client', world.create_client), LoopLagMonitor() as lag:
+        for index in range(args.bots):
+            port = responders[index % args.servers][0]
+            channels = [world.create_channel() for _ in range(3)]
+            bot_config = parse_bot_config(bench_bot_config(index, port, channels, args.poll_interval, args.a2s_details))
+            fleet.start_bot(bot_config, f"bench-{index}")
+        await asyncio.sleep(args.duration)
+        for bot_name in list(fleet.bots):
+            await fleet.stop_bot(bot_name)
+    await connection_pool.close()
+
+    for _, _, transport in responders:
+        transport.close()
+    return {
+        'bots': args.bots,
+        'servers': args.servers,
+        'duration_s': args.duration,
+        'udp_queries': sum(responder.requests for _, responder, _ in responders),
+        'rest_calls': dict(world.recorder.counts),
+        'rest_latency': {name: latency_summary(samples) for name, samples in world.recorder.timings.items()},
+        'outbound': outbound_queue.stats(),
+        'loop_lag': lag.summary()
+    }
+
+
+def bench_chat_matching(args, corpus, state_dir):
+    """Time LifxChatBot.get_response on its own, over every game's response set."""
+    chat_bot = LifxChatBot(None, args.fuzzy_threshold, os.path.join(state_dir, 'chat_profiles.json'))
+    response_sets = [response_store.load(path) for path in sorted(glob.glob(os.path.join('GameRelatedResponses', '*.json')))]
+    timings = []
+    hits = 0
+
+    started = time.perf_counter()
+    for index, text in enumerate(corpus):
+        call_started = time.perf_counter()
+        response = chat_bot.get_response(text, response_sets[index % len(response_sets)])
+        timings.append(time.perf_counter() - call_started)
+        hits += response is not None
+    elapsed = time.perf_counter() - started
+
+    return {
+        'messages': len(corpus),
+        'messages_per_second': round(len(corpus) / elapsed, 1),
+        'hit_ratio': round(hits / len(corpus), 3),
+        'latency': latency_summary(timings)
+    }
+
+
+async def bench_chat_replay(args, corpus, state_dir):
+    """Replay the corpus through LifxChatBot.handle_message at a target rate, as the gateway would dispatch it."""
+    world = FakeWorld(rest_latency=args.rest_latency)
+    chat_bot = LifxChatBot(None, args.fuzzy_threshold, os.path.join(state_dir, 'chat_profiles.json'))
+    channels = [world.create_channel() for _ in range(args.channels)]
+    handlers = []
+    batch = max(1, args.chat_rate // 100)  # Dispatch in 10 ms batches
+    dispatched = 0
+
+    with LoopLagMonitor() as lag:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        while loop.time() - started < args.duration:
+            for _ in range(batch):
+                message = world.user_message(channels[dispatched % len(channels)], corpus[dispatched % len(corpus)])
+                handlers.append(asyncio.ensure_future(chat_bot.handle_message(message)))
+                dispatched += 1
+            await asyncio.sleep(max(0, started + dispatched / args.chat_rate - loop.time()))
+        elapsed = loop.time() - started
+
+    stats = outbound_queue.stats()
+    for handler in handlers:
+        handler.cancel()
+    return {
+        'dispatched': dispatched,
+        'messages_per_second': round(dispatched / elapsed, 1),
+        'rest_calls': dict(world.recorder.counts),
+        'outbound': stats,
+        'loop_lag': lag.summary()
+    }
+
+
+async def run_benchmarks(args):
+    results = {}
+    corpus = build_chat_corpus(args.corpus_size)
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        # The bots print a line per scheduled job; keep the report readable
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(sys.stdout if args.verbose else devnull):
+            results['a2s'] = await bench_a2s(args)
+            results['fleet'] = await bench_fleet(args, state_dir)
+            results['chat_matching'] = bench_chat_matching(args, corpus, state_dir)
+            results['chat_replay'] = await bench_chat_replay(args, corpus, state_dir)
+    return results
+
+
+def check_budgets(args, results):
+    """Return the list of exceeded budgets."""
+    failures = []
+    if args.max_chat_p99_ms is not None and results['chat_matching']['latency']['p99_ms'] > args.max_chat_p99_ms:
+        failures.append(f"chat matching p99 {results['chat_matching']['latency']['p99_ms']} ms > {args.max_chat_p99_ms} ms")
+    if args.max_a2s_p99_ms is not None and results['a2s']['latency']['p99_ms'] > args.max_a2s_p99_ms:
+        failures.append(f"A2S refresh p99 {results['a2s']['latency']['p99_ms']} ms > {args.max_a2s_p99_ms} ms")
+    if args.max_loop_lag_ms is not None:
+        for scenario in ('a2s', 'fleet', 'chat_replay'):
+            lag = results[scenario]['loop_lag']['p99_ms']
+            if lag > args.max_loop_lag_ms:
+                failures.append(f"{scenario} loop lag p99 {lag} ms > {args.max_loop_lag_ms} ms")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load benchmark for the bot against local A2S servers and a fake Discord.")
+    parser.add_argument('--bots', type=int, default=200, help="Number of bot configs to simulate.")
+    parser.add_argument('--servers', type=int, default=50, help="Number of local A2S servers the bots are spread over.")
+    parser.add_argument('--duration', type=float, default=10, help="Seconds to run the fleet and chat replay scenarios.")
+    parser.add_argument('--poll-interval', type=float, default=1.0, help="update_interval given to the simulated bots.")
+    parser.add_argument('--a2s-rounds', type=int, default=20, help="Rounds of A2S refreshes in the A2S scenario.")
+    parser.add_argument('--a2s-latency', type=float, default=0.005, help="Reply delay of the local A2S servers, in seconds.")
+    parser.add_argument('--a2s-details', action='store_true', help="Also query player lists and rules, as bots with show_players/show_rules do.")
+    parser.add_argument('--a2s-loss', type=float, default=0.0, help="Fraction of A2S requests the local servers drop.")
+    parser.add_argument('--player-churn', type=float, default=0.3, help="Chance the player count changes between queries.")
+    parser.add_argument('--login-interval', type=float, default=0.0, help="Seconds between the simulated bots' logins.")
+    parser.add_argument('--rest-latency', type=float, default=0.02, help="Latency of every fake Discord REST call, in seconds.")
+    parser.add_argument('--chat-rate', type=int, default=2000, help="Messages per second replayed through handle_message.")
+    parser.add_argument('--channels', type=int, default=100, help="Channels the replayed chat is spread over.")
+    parser.add_argument('--corpus-size', type=int, default=20000, help="Number of chat lines in the replay corpus.")
+    parser.add_argument('--fuzzy-threshold', type=float, default=None, help="Enable fuzzy matching with this threshold.")
+    parser.add_argument('--json', help="Write the results to this file.")
+    parser.add_argument('--max-chat-p99-ms', type=float, default=None, help="Fail if chat matching p99 exceeds this.")
+    parser.add_argument('--max-a2s-p99-ms', type=float, default=None, help="Fail if A2S refresh p99 exceeds this.")
+    parser.add_argument('--max-loop-lag-ms', type=float, default=None, help="Fail if any scenario's loop lag p99 exceeds this.")
+    parser.add_argument('--verbose', action='store_true', help="Keep the bots' own output.")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)  # LifxChatBot warns on every unmatched message
+    results = asyncio.run(run_benchmarks(args))
+    print(json.dumps(results, indent=2))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    failures = check_budgets(args, results)
+    for failure in failures:
+        print(f"Budget exceeded: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,96 +1,358 @@
+import argparse
 import asyncio
+import collections
+import datetime
 import discord
 import json
 import os
+import time
+import zlib
 import a2s
-from LifxChatBot import LifxChatBot  # Import the LifxChatBot
+from LifxChatBot import LifxChatBot, set_message_log_sampling  # Import the LifxChatBot
+from PollScheduler import PollScheduler
+from PlayerHistory import PlayerHistory, PresenceRenderer
+from HotReload import HotReloader
+from OutboundQueue import outbound_queue, request_bot
+from ConnectionPool import connection_pool
+from BotConfig import load_bot_configs, read_bot_config
+from Metrics import metrics
+from ServerInfoEmbed import ServerInfoEmbed, server_info_fields
+
+# Config keys a running bot can't pick up without reconnecting
+RESTART_CONFIG_KEYS = (
+    'bot_token', 'server_ip', 'query_port', 'server_status', 'server_information', 'server_rules',
+    'history_file', 'fuzzy_threshold', 'show_players', 'show_rules'
+)
+
+# Seconds all A2S queries of one poll share, and how long player lists and rules are reused
+A2S_TIMEOUT_BUDGET = 5
+DETAIL_TTLS = {
+    'players': 60,
+    'rules': 600
+}
+
+# Map name from A2S_INFO, players as (name, score, duration) tuples and the rules dict; None until queried
+ServerDetails = collections.namedtuple('ServerDetails', ['map_name', 'players', 'rules'])
+NO_DETAILS = ServerDetails(None, None, None)
+
+def worker_state_path(file_path, worker_index=0, worker_count=1):
+    """Per-worker name for a state file so worker processes never write the same one: state.json -> state.2.json."""
+    if worker_count == 1:
+        return file_path
+    root, extension = os.path.splitext(file_path)
+    return f"{root}.{worker_index}{extension}"
 
 class MessageManager:
-    def __init__(self):
-        self.message_cache = {}
-
-    async def delete_old_messages(self, channel, ignore_ids=[]):
+    def __init__(self, state_file_path='message_state.json', fallback_state_file_path=None):
+        self.state_file_path = state_file_path
+        # Read when state_file_path doesn't exist yet, e.g. the shared file of a single-process run
+        self.fallback_state_file_path = fallback_state_file_path
+        self.message_cache = self.load_state()  # "bot:channel_id:kind" -> owned message id
+
+    def load_state(self):
+        """Load the owned message IDs persisted by a previous run."""
+        for path in (self.state_file_path, self.fallback_state_file_path):
+            if path is None:
+                continue
+            try:
+                with open(path, 'r') as f:
+                    return json.load(f)
+            except FileNotFoundError:
+                continue
+            except json.JSONDecodeError:
+                return {}
+        return {}
+
+    def save_state(self):
+        """Persist the owned message IDs so they survive restarts."""
+        temp_path = self.state_file_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(self.message_cache, f)
+        os.replace(temp_path, self.state_file_path)
+
+    async def delete_old_messages(self, channel, ignore_ids=[], bot='default'):
         """Delete old messages sent by the bot in the channel."""
+        bulk_cutoff = datetime.datetime.utcnow() - datetime.timedelta(days=14)
+        recent_messages = []
+        old_messages = []
         async for message in channel.history(limit=100):
-            if message.author == channel.guild.me:
-                if message.id not in ignore_ids:
-                    try:
-                        await message.delete()
-                        print(f"Deleted old message: {message.id}")
-                    except discord.NotFound:
-                        print(f"Message {message.id} not found for deletion.")
-                    except Exception as e:
-                        print(f"Failed to delete message {message.id}: {e}")
-
-    async def send_embedded_message(self, channel, embed):
+            if message.author == channel.guild.me and message.id not in ignore_ids:
+                if message.created_at > bulk_cutoff:
+                    recent_messages.append(message)
+                else:
+                    old_messages.append(message)
+
+        if recent_messages:
+            try:
+                with metrics.timer('lifx_discord_request_seconds', kind='bulk_delete', bot=bot):
+                    await channel.delete_messages(recent_messages)
+                print(f"Bulk deleted {len(recent_messages)} old messages in {channel.id}")
+            except discord.Forbidden:
+                old_messages.extend(recent_messages)  # Bulk delete needs Manage Messages
+            except Exception as e:
+                print(f"Failed to bulk delete messages in {channel.id}: {e}")
+
+        for message in old_messages:
+            try:
+                with metrics.timer('lifx_discord_request_seconds', kind='delete', bot=bot):
+                    await message.delete()
+                print(f"Deleted old message: {message.id}")
+            except discord.NotFound:
+                print(f"Message {message.id} not found for deletion.")
+            except Exception as e:
+                print(f"Failed to delete message {message.id}: {e}")
+
+    async def send_embedded_message(self, channel, embed, bot='default'):
         """Send an embedded message to the specified channel."""
-        message = await channel.send(embed=embed)
+        message = await outbound_queue.send(channel, embed=embed, bot=bot)
         print(f"Sent message: {message.id}")
         return message
 
-async def get_server_info(address):
-    """Fetch real server information using a2s."""
+    async def publish_embed(self, channel, kind, embed, bot='default'):
+        """Edit the message the bot owns for this channel and embed kind, or post a new one."""
+        # Bots in one process share the manager and may post into the same channel
+        cache_key = f"{bot}:{channel.id}:{kind}"
+        message_id = self.message_cache.get(cache_key)
+
+        if message_id:
+            try:
+                message = await outbound_queue.submit(channel, lambda: channel.get_partial_message(message_id).edit(embed=embed), bot=bot)
+                print(f"Edited message: {message_id}")
+                return message
+            except (discord.NotFound, discord.Forbidden):
+                print(f"Owned message {message_id} is gone or not editable, sending a new one.")
+
+        # Clean up this bot's leftovers, keeping its messages owned for other kinds in this channel
+        owned_ids = [owned_id for key, owned_id in self.message_cache.items() if key != cache_key and key.startswith(f"{bot}:{channel.id}:")]
+        await self.delete_old_messages(channel, ignore_ids=owned_ids, bot=bot)
+
+        message = await self.send_embedded_message(channel, embed, bot)
+        self.message_cache[cache_key] = message.id
+        self.save_state()
+        return message
+
+class ServerPoller:
+    def __init__(self, worker_index=0, worker_count=1):
+        self.worker_index = worker_index
+        self.worker_count = worker_count
+        self.snapshots = {}  # (ip, port) -> (players, max_players, online)
+        self.fetched_at = {}  # (ip, port) -> loop time of the last query
+        self.in_flight = {}  # (ip, port) -> future of the running query
+        self.histories = {}  # (ip, port) -> PlayerHistory of every query result
+        self.details = {}  # (ip, port) -> ServerDetails
+        self.detail_queries = {}  # (ip, port) -> set of detail queries ('players', 'rules') some bot wants
+        self.detail_fetched = {}  # ((ip, port), query) -> loop time the detail was last fetched
+
+    def register(self, server_ip, query_port, history_file=None, details=()):
+        """Return the shared cache key for a server endpoint, creating its player history."""
+        address = (server_ip, int(query_port) if query_port else None)
+        if address not in self.histories:
+            if history_file:
+                # Bots of different workers may poll the same server with the same history file
+                history_file = worker_state_path(history_file, self.worker_index, self.worker_count)
+            self.histories[address] = PlayerHistory(file_path=history_file)
+        if details:
+            self.detail_queries[address] = self.detail_queries.get(address, set()) | set(details)
+        return address
+
+    async def refresh(self, address, max_age=0):
+        """Return a snapshot no older than max_age seconds, sharing one query between concurrent callers."""
+        loop = asyncio.get_running_loop()
+        if address in self.snapshots and loop.time() - self.fetched_at[address] < max_age:
+            return self.snapshots[address]
+
+        if address not in self.in_flight:
+            query = self.in_flight[address] = asyncio.ensure_future(self.query(address))
+
+            def forget(done):
+                # Runs when the query ends, even if every caller was cancelled while waiting
+                if self.in_flight.get(address) is done:
+                    del self.in_flight[address]
+
+            query.add_done_callback(forget)
+        return await asyncio.shield(self.in_flight[address])
+
+    async def query(self, address):
+        """Query the server once, caching and recording the result.
+
+        Player lists and rules are only re-queried once their TTL ran out, in the
+        same round and timeout budget as the info query.
+        """
+        now = asyncio.get_running_loop().time()
+        stale = [
+            detail for detail in sorted(self.detail_queries.get(address, ()))
+            if now - self.detail_fetched.get((address, detail), float('-inf')) >= DETAIL_TTLS[detail]
+        ]
+        snapshot, map_name, results = await query_server(address, stale)
+
+        self.snapshots[address] = snapshot
+        self.fetched_at[address] = now
+        if snapshot[2]:
+            for detail in results:
+                self.detail_fetched[(address, detail)] = now
+            self.details[address] = self.details.get(address, NO_DETAILS)._replace(map_name=map_name, **results)
+        else:
+            # Nothing is known about an offline server; re-query everything once it is back
+            self.details.pop(address, None)
+            for detail in self.detail_queries.get(address, ()):
+                self.detail_fetched.pop((address, detail), None)
+        if address in self.histories:
+            self.histories[address].append(*snapshot)
+        return snapshot
+
+    async def get_snapshot(self, address):
+        """Return the most recent (players, max_players, online) snapshot for an address."""
+        if address not in self.snapshots:
+            return await self.refresh(address)
+        return self.snapshots[address]
+
+    def get_details(self, address):
+        """Return the cached ServerDetails of an address."""
+        return self.details.get(address, NO_DETAILS)
+
+    def detail_state(self, address):
+        """The details without the ever-growing session durations, for change detection."""
+        details = self.get_details(address)
+        player_names = tuple(name for name, _, _ in details.players) if details.players is not None else None
+        return details.map_name, player_names, details.rules
+
+async def query_server(address, details=(), budget=A2S_TIMEOUT_BUDGET):
+    """Query a server's A2S info and the given details ('players', 'rules') concurrently within one timeout budget.
+
+    Returns the (players, max_players, online) snapshot, the map name and a dict
+    of the detail queries that answered in time.
+    """
+    server = f"{address[0]}:{address[1]}"  # Metrics label
+    queries = {'info': a2s.ainfo, 'players': a2s.aplayers, 'rules': a2s.arules}
+    started = time.perf_counter()
+    tasks = {query: asyncio.ensure_future(queries[query](address, timeout=budget)) for query in ('info', *details)}
     try:
-        ip = address.get('server_ip')
-        port = int(address.get('query_port')) if address.get('query_port') else None
-        
-        info = a2s.info((ip, port), timeout=5)
-        players = int(info.player_count) if info.player_count is not None else 0
-        max_players = int(info.max_players) if info.max_players is not None else 0
-        
-        return players, max_players, True  # Server is online
-    except Exception as e:
-        print(f"Error fetching server info: {e}")
-        return 0, 0, False  # Server is offline
-
-async def setup_discord_bot(message_manager, bot_config, bot_name, stagger_delay):
+        _, pending = await asyncio.wait(tasks.values(), timeout=budget)
+    finally:
+        for task in tasks.values():
+            task.cancel()
+    metrics.observe('lifx_a2s_query_seconds', time.perf_counter() - started, server=server)
+
+    results = {}
+    for query, task in tasks.items():
+        if task in pending or isinstance(task.exception(), asyncio.TimeoutError):
+            metrics.inc('lifx_a2s_timeouts_total', server=server, query=query)
+            print(f"Error fetching server {query}: {server} timed out")
+        elif task.exception() is not None:
+            metrics.inc('lifx_a2s_errors_total', server=server, query=query)
+            print(f"Error fetching server {query}: {task.exception()}")
+        else:
+            results[query] = task.result()
+
+    info = results.pop('info', None)
+    if info is None:
+        return (0, 0, False), None, {}  # Server is offline
+
+    players = int(info.player_count) if info.player_count is not None else 0
+    max_players = int(info.max_players) if info.max_players is not None else 0
+    if 'players' in results:
+        # Players still connecting have no name yet
+        results['players'] = tuple((player.name, player.score, player.duration) for player in results['players'] if player.name)
+    return (players, max_players, True), info.map_name, results
+
+async def setup_discord_bot(message_manager, server_poller, bot_configs, bot_name, stagger_delay, config_reloaded):
+    request_bot.set(bot_name)  # Inherited by the client's tasks, so their logged 429s count for this bot
+
     # Set up intents
     intents = discord.Intents.default()
     intents.messages = True  # Enable message intent
     intents.guilds = True    # Include guilds intent
 
-    client = discord.Client(intents=intents)
+    # Every client shares the process's connector and login slots
+    client = discord.Client(intents=intents, **connection_pool.client_options())
+    connection_pool.attach(client)
+
+    periodic_tasks = []
+
+    # The jobs read bot_configs[bot_name] on every run to pick up hot reloads; settings
+    # read once here are in RESTART_CONFIG_KEYS, so changing them restarts the bot
+    bot_config = bot_configs[bot_name]
 
     # Initialize LifxChatBot with responses file
-    lifx_chat_bot = LifxChatBot(bot_config.get('responses_file_path', 'responses.json'))  # Path to the JSON responses
+    lifx_chat_bot = LifxChatBot(None, bot_config.fuzzy_threshold, f"chat_profiles_{bot_name}.json", bot_name, bot_config.responses_file_path)
+
+    details = [detail for detail, enabled in (('players', bot_config.show_players), ('rules', bot_config.show_rules)) if enabled]
+    server_address = server_poller.register(bot_config.server_ip, bot_config.query_port, bot_config.history_file, details)
+    presence_renderer = {}  # Rebuilt when the config is reloaded
+    loaded_responses = {'path': bot_config.responses_file_path}  # Config value last applied to lifx_chat_bot
+    info_embed = ServerInfoEmbed()  # Kept between updates so unchanged fields aren't redrawn
 
     @client.event
     async def on_ready():
         print(f"{bot_name} | Bot logged in as {client.user}")
 
+        if any(not task.done() for task in periodic_tasks):
+            return  # Reconnected; the scheduler is already running
+
         # Fetch channels from config
         try:
-            server_status_channel_id = bot_config['webhooks']['server_status']['channel_id']
-            server_info_channel_id = bot_config['webhooks']['server_information']['channel_id']
-            server_rules_channel_id = bot_config['webhooks']['server_rules']['channel_id']
-
-            server_status_channel = client.get_channel(int(server_status_channel_id))
-            server_info_channel = client.get_channel(int(server_info_channel_id))
-            server_rules_channel = client.get_channel(int(server_rules_channel_id))
+            server_status_channel = client.get_channel(bot_config.server_status.channel_id)
+            server_info_channel = client.get_channel(bot_config.server_information.channel_id)
+            server_rules_channel = client.get_channel(bot_config.server_rules.channel_id)
 
             if not all([server_status_channel, server_info_channel, server_rules_channel]):
                 raise ValueError(f"One or more channels for {bot_name} could not be found.")
 
+            intervals = bot_config.intervals
+
+            def apply_intervals():
+                """Move the jobs to the intervals of a hot-reloaded config."""
+                reloaded = bot_configs[bot_name]
+                base_intervals = {'poll': reloaded.update_interval, **reloaded.intervals}
+                for name, job in scheduler.jobs.items():
+                    if job.base_interval != base_intervals[name]:
+                        scheduler.set_base_interval(name, base_intervals[name])
+
+            scheduler = PollScheduler(wakeup=config_reloaded, on_wakeup=apply_intervals)
+            last_seen = {}  # Job name -> state it last published
+
+            async def poll_server():
+                """Query the server and wake the jobs that publish what changed.
+
+                Player counts move almost every poll on a busy server, so they only
+                wake the presence; the embeds pick them up on their own interval.
+                Only an online/offline flip or a map or player list change counts
+                as a change of the server's state.
+                """
+                snapshot = await server_poller.refresh(server_address, max_age=scheduler.jobs['poll'].min_interval)
+                if snapshot != last_seen.get('snapshot'):
+                    last_seen['snapshot'] = snapshot
+                    scheduler.trigger('presence')
+                state = (snapshot[2], server_poller.detail_state(server_address))
+                if state == last_seen.get('poll'):
+                    return False
+                last_seen['poll'] = state
+                scheduler.trigger('status', 'information')
+                return True
+
+            # Poll the server at the config's update_interval, adapting to how often it changes
+            scheduler.add_job('poll', poll_server, bot_config.update_interval, initial_delay=stagger_delay)
+            scheduler.add_job('presence', lambda: update_presence(server_address, last_seen), intervals['presence'], initial_delay=stagger_delay)
+
             # Start periodic updates if enabled
-            if bot_config['webhooks']['server_status']['enabled']:
-                client.loop.create_task(periodic_server_status_update(client, server_status_channel, bot_config, bot_name))
+            if bot_config.server_status.enabled:
+                scheduler.add_job('status', lambda: update_server_status(server_status_channel, server_address, last_seen), intervals['status'])
             else:
                 print(f"{bot_name} | Server status updates are disabled.")
 
-            if bot_config['webhooks']['server_information']['enabled']:
-                client.loop.create_task(periodic_server_info_update(server_info_channel, bot_config, bot_name))
+            if bot_config.server_information.enabled:
+                # Edited at most once per interval, however often the players change
+                scheduler.add_job('information', lambda: update_server_info(server_info_channel, server_address), intervals['information'], min_interval=intervals['information'])
             else:
                 print(f"{bot_name} | Server information updates are disabled.")
 
-            if bot_config['webhooks']['server_rules']['enabled']:
-                client.loop.create_task(periodic_server_rules_update(server_rules_channel, bot_config, bot_name))
+            if bot_config.server_rules.enabled:
+                scheduler.add_job('rules', lambda: update_server_rules(server_rules_channel, last_seen), intervals['rules'])
             else:
                 print(f"{bot_name} | Server rules updates are disabled.")
 
-            client.loop.create_task(periodic_presence_update(client, bot_config, stagger_delay, bot_name))
+            periodic_tasks.append(client.loop.create_task(scheduler.run()))
 
-        except KeyError as e:
-            print(f"Missing required configuration for {bot_name}: {e}")
         except Exception as e:
             print(f"An error occurred while setting up {bot_name}: {e}")
 
@@ -99,169 +361,235 @@ async def setup_discord_bot(message_manager, bot_config, bot_name, stagger_delay
         if message.author.bot:
             return  # Ignore messages from bots
 
-        # Get a response from LifxChatBot
-        response = await lifx_chat_bot.handle_message(message)
-        if response:
-            await message.channel.send(response)  # Send the response back to the channel
+        if message.content.startswith('!lifxstats'):
+            await send_player_stats(message)
+            return
+
+        # Pick up a hot-reloaded responses file before replying
+        responses_file_path = bot_configs[bot_name].responses_file_path
+        if responses_file_path != loaded_responses.get('path'):
+            loaded_responses['path'] = responses_file_path
+            lifx_chat_bot.set_default_responses(responses_file_path)
+
+        # LifxChatBot replies through the shared outbound queue itself
+        await lifx_chat_bot.handle_message(message)
+
+    async def send_player_stats(message):
+        """Reply with peak, average and uptime stats over the last N hours (default 24)."""
+        arguments = message.content.split()
+        try:
+            hours = float(arguments[1]) if len(arguments) > 1 else 24
+        except ValueError:
+            await outbound_queue.send(message.channel, "Usage: !lifxstats [hours]", dedupe=False, bot=bot_name)
+            return
+
+        stats = server_poller.histories[server_address].stats(hours * 3600)
+        bot_config = bot_configs[bot_name]
+        if stats is None:
+            response = f"No player history recorded in the last {hours:g}h."
+        else:
+            # The ring may not reach back over the whole window, e.g. while polling fast
+            covered = f"{hours:g}h" if stats['span'] >= hours * 3600 else f"{stats['span'] / 3600:.1f}h (all recorded history)"
+            response = (
+                f"{bot_config.server_name} over the last {covered}: "
+                f"peak {stats['peak']}/{stats['max_players']} players, "
+                f"average {stats['average']:.1f} players, "
+                f"uptime {stats['uptime']:.1%} ({stats['samples']} samples)"
+            )
+        await outbound_queue.send(message.channel, response, dedupe=False, bot=bot_name)
 
     @client.event
     async def on_message(message):
         """Handle incoming messages from users."""
         await handle_message(message)
 
-    async def update_bot_presence(client, players_online, max_players):
+    async def update_bot_presence(client, presence_text):
         """Update the bot's presence to show current player count."""
-        await client.change_presence(activity=discord.Activity(type=discord.ActivityType.watching, name=f"{players_online}/{max_players} players"))
-        print(f"Updated bot presence: {players_online}/{max_players} players online for {client.user}")
+        with metrics.timer('lifx_discord_request_seconds', kind='presence', bot=bot_name):
+            await client.change_presence(activity=discord.Activity(type=discord.ActivityType.watching, name=presence_text))
+        print(f"Updated bot presence: {presence_text} for {client.user}")
 
-    async def periodic_presence_update(client, bot_config, stagger_delay, bot_name):
-        """Periodically update bot's presence."""
-        await client.wait_until_ready()
-        
-        while not client.is_closed():
-            players_online, max_players, _ = await get_server_info({
-                'server_ip': bot_config['server_ip'],
-                'query_port': bot_config['query_port']
-            })
+    async def update_presence(server_address, last_seen):
+        """Update bot's presence when the rendered player count changed."""
+        players_online, max_players, server_online = await server_poller.get_snapshot(server_address)
 
-            await update_bot_presence(client, players_online, max_players)
-            await asyncio.sleep(60 + stagger_delay)
+        bot_config = bot_configs[bot_name]
+        if presence_renderer.get('config') is not bot_config:
+            presence_renderer['config'] = bot_config
+            presence_renderer['renderer'] = PresenceRenderer(bot_config)
 
-    async def periodic_server_status_update(client, channel, bot_config, bot_name):
-        """Periodically check and update server status."""
-        await client.wait_until_ready()
+        presence_text = presence_renderer['renderer'].render(players_online, max_players, server_online)
+        if presence_text == last_seen.get('presence'):
+            return False
 
-        previous_status = None  # Keep track of the previous status
+        await update_bot_presence(client, presence_text)
+        last_seen['presence'] = presence_text
+        return True
 
-        while not client.is_closed():
-            try:
-                players_online, max_players, server_online = await get_server_info({
-                    'server_ip': bot_config['server_ip'],
-                    'query_port': bot_config['query_port']
-                })
-
-                # Only update if server status has changed
-                if server_online != previous_status:
-                    embed = discord.Embed(
-                        title="Server Status", 
-                        color=0x00FF00 if server_online else 0xFF0000
-                    )
-                    embed.description = "@everyone " + ("Server is Online." if server_online else "Server is down.")
-
-                    await message_manager.delete_old_messages(channel)
-                    await message_manager.send_embedded_message(channel, embed)
-
-                    previous_status = server_online  # Update previous status
-                else:
-                    print(f"{bot_name} | Skipped server status update: No changes in status.")
-            except Exception as e:
-                print(f"Error during status update: {e}")
+    async def update_server_status(channel, server_address, last_seen):
+        """Check and update server status."""
+        players_online, max_players, server_online = await server_poller.get_snapshot(server_address)
 
-            await asyncio.sleep(720)
+        # Only update if server status has changed
+        if server_online == last_seen.get('status'):
+            print(f"{bot_name} | Skipped server status update: No changes in status.")
+            return False
 
-    async def periodic_server_info_update(channel, bot_config, bot_name):
-        """Periodically update server information."""
-        await client.wait_until_ready()
+        embed = discord.Embed(
+            title="Server Status", 
+            color=0x00FF00 if server_online else 0xFF0000
+        )
+        embed.description = "@everyone " + ("Server is Online." if server_online else "Server is down.")
 
-        previous_info = None  # Keep track of the previous server info
+        await message_manager.publish_embed(channel, 'status', embed, bot_name)
 
-        while not client.is_closed():
-            try:
-                players_online, max_players, server_online = await get_server_info({
-                    'server_ip': bot_config['server_ip'],
-                    'query_port': bot_config['query_port']
-                })
-
-                current_info = {
-                    "players_online": players_online,
-                    "max_players": max_players,
-                    "server_online": server_online
-                }
-
-                # Only update if server info has changed
-                if current_info != previous_info:
-                    embed_server_info = discord.Embed(title="Server Information", color=0x00FF00)
-                    embed_server_info.add_field(name="Server Name", value=bot_config['server_name'], inline=False)
-                    embed_server_info.add_field(name="Players Online", value=f"{players_online}/{max_players}", inline=False)
-                    embed_server_info.add_field(name="Server IP", value=bot_config['server_ip'])
-                    embed_server_info.add_field(name="Connect Port", value=bot_config['server_port'])
-                    embed_server_info.add_field(name="Query Port", value=bot_config['query_port'])
-                    embed_server_info.add_field(name="Last Wipe Date", value=bot_config.get('last_wipe', 'N/A'))
-                    embed_server_info.add_field(name="Next Planned Wipe Date", value=bot_config.get('next_wipe', 'N/A'))
-                    embed_server_info.add_field(name="Live Map", value=bot_config.get('livemap', 'N/A'), inline=False)
-
-                    map_image_url = bot_config.get('map_image', None)
-                    if map_image_url:
-                        embed_server_info.set_image(url=map_image_url)  # Set the image if the URL exists
-
-                    await message_manager.delete_old_messages(channel)
-                    await message_manager.send_embedded_message(channel, embed_server_info)
-
-                    previous_info = current_info  # Update previous info
-                else:
-                    print(f"{bot_name} | Skipped server info update: No changes in server info.")
-            except Exception as e:
-                print(f"Error during server information update: {e}")
+        last_seen['status'] = server_online  # Update previous status
+        return True
 
-            await asyncio.sleep(3600)
+    async def update_server_info(channel, server_address):
+        """Update server information."""
+        snapshot = await server_poller.get_snapshot(server_address)
 
-    async def periodic_server_rules_update(channel, bot_config, bot_name):
-        """Periodically update server rules."""
-        await client.wait_until_ready()
+        # Config fields are rendered too so hot-reloaded edits get published
+        bot_config = bot_configs[bot_name]
+        fields = server_info_fields(bot_config, snapshot, server_poller.get_details(server_address))
 
-        previous_rules = None  # Initialize a variable to store the previous rules
+        # Only update if the rendered server info has changed
+        if not info_embed.render(fields, bot_config.map_image):
+            print(f"{bot_name} | Skipped server info update: No changes in server info.")
+            return False
 
-        while not client.is_closed():
-            try:
-                # Get current rules from the config
-                current_rules = bot_config.get('rules', ["No rules specified."])
-
-                # Compare current rules with previous rules
-                if current_rules != previous_rules:
-                    # If rules have changed, update the embed and send a new message
-                    embed_rules = discord.Embed(title="Server Rules", color=0x00FF00)
-                    embed_rules.description = "\n".join([f"{index + 1}. {rule}" for index, rule in enumerate(current_rules)])
-
-                    await message_manager.delete_old_messages(channel)
-                    await message_manager.send_embedded_message(channel, embed_rules)
-
-                    # Update previous_rules to the current state
-                    previous_rules = current_rules
-                else:
-                    print(f"{bot_name} | Skipped rules update: No changes in server rules.")
-            except Exception as e:
-                print(f"Error during server rules update: {e}")
-
-            await asyncio.sleep(9320)
+        try:
+            await message_manager.publish_embed(channel, 'info', info_embed.embed, bot_name)
+        except Exception:
+            info_embed.invalidate()  # Not published, so redraw it all next time
+            raise
+        return True
 
-    await client.start(bot_config['bot_token'])
+    async def update_server_rules(channel, last_seen):
+        """Update server rules."""
+        # Get current rules from the config
+        current_rules = bot_configs[bot_name].rules
 
-async def load_bot_configs():
-    """Load bot configurations from JSON files in the 'Bots' folder."""
-    config_dir = "Bots"
-    bot_configs = []
+        # Compare current rules with previous rules
+        if current_rules == last_seen.get('rules'):
+            print(f"{bot_name} | Skipped rules update: No changes in server rules.")
+            return False
 
-    if not os.path.exists(config_dir):
-        raise FileNotFoundError(f"Configuration directory '{config_dir}' does not exist.")
+        # If rules have changed, update the embed and send a new message
+        embed_rules = discord.Embed(title="Server Rules", color=0x00FF00)
+        embed_rules.description = "\n".join([f"{index + 1}. {rule}" for index, rule in enumerate(current_rules)])
 
-    for filename in os.listdir(config_dir):
-        if filename.endswith('.json'):
-            with open(os.path.join(config_dir, filename), 'r') as f:
-                bot_config = json.load(f)
-                bot_name = os.path.splitext(filename)[0]
-                bot_configs.append((bot_config, bot_name))
+        await message_manager.publish_embed(channel, 'rules', embed_rules, bot_name)
 
-    return bot_configs
+        # Update previous_rules to the current state
+        last_seen['rules'] = current_rules
+        return True
 
-async def main():
-    message_manager = MessageManager()
-    bot_configs = await load_bot_configs()
-    
-    stagger_delay = 0
+    try:
+        await connection_pool.wait_for_login_slot()
+        await client.start(bot_config.bot_token)
+    finally:
+        for task in periodic_tasks:
+            task.cancel()
+        lifx_chat_bot.purge_engine.cancel_all()  # Purges run in their own tasks and would outlive the client
+        if not client.is_closed():
+            await client.close()
+
+def bot_hash(bot_name):
+    """Stable hash of a bot name, identical in every worker process."""
+    return zlib.crc32(bot_name.encode('utf-8'))
+
+class BotFleet:
+    """Running bots keyed by name, so single bots can be started, updated or stopped."""
+
+    def __init__(self, message_manager, server_poller, worker_index=0, worker_count=1):
+        self.message_manager = message_manager
+        self.server_poller = server_poller
+        self.worker_index = worker_index
+        self.worker_count = worker_count
+        self.bots = {}  # bot_name -> (config_reloaded event, task)
+        self.configs = {}  # bot_name -> current BotConfig, read by the bot's jobs
+        self.read_config = read_bot_config
+
+    def owns(self, bot_name):
+        """Whether this process runs the bot; configs are sharded by name across workers."""
+        return bot_hash(bot_name) % self.worker_count == self.worker_index
+
+    def start_bot(self, bot_config, bot_name):
+        """Start a bot's client in its own task."""
+        stagger_delay = (bot_hash(bot_name) % 1000) / 1000 * bot_config.update_interval
+        config_reloaded = asyncio.Event()
+        self.configs[bot_name] = bot_config
+        task = asyncio.ensure_future(setup_discord_bot(self.message_manager, self.server_poller, self.configs, bot_name, stagger_delay, config_reloaded))
+        self.bots[bot_name] = (config_reloaded, task)
+        print(f"{bot_name} | Bot started.")
+
+    async def stop_bot(self, bot_name):
+        """Stop a bot's client without touching the others."""
+        config_reloaded, task = self.bots.pop(bot_name)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        del self.configs[bot_name]
+        print(f"{bot_name} | Bot stopped.")
+
+    async def update_bot(self, new_config, bot_name):
+        """Apply an edited config, restarting the bot only if its connection settings changed."""
+        config_reloaded, task = self.bots[bot_name]
+        bot_config = self.configs[bot_name]
+        if any(getattr(new_config, key) != getattr(bot_config, key) for key in RESTART_CONFIG_KEYS):
+            await self.stop_bot(bot_name)
+            self.start_bot(new_config, bot_name)
+            return
+
+        # Swap the config the scheduled jobs read, then make them all due
+        self.configs[bot_name] = new_config
+        config_reloaded.set()
+        print(f"{bot_name} | Bot config reloaded.")
+
+async def report_status(fleet, status_queue, interval=30):
+    """Periodically send this worker's health to the supervisor."""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        running = [bot_name for bot_name, (_, task) in fleet.bots.items() if not task.done()]
+        status_queue.put({
+            'worker': fleet.worker_index,
+            'pid': os.getpid(),
+            'bots': len(fleet.bots),
+            'running': len(running),
+            'crashed': sorted(set(fleet.bots) - set(running)),
+            'loop_lag': round(loop.time() - started - interval, 3),
+            **outbound_queue.stats()
+        })
+
+async def main(worker_index=0, worker_count=1, status_queue=None, metrics_port=None, message_log_sample_rate=1.0):
+    set_message_log_sampling(message_log_sample_rate)
+    asyncio.ensure_future(metrics.monitor_loop_lag(worker=worker_index))
+    if metrics_port is not None:
+        await metrics.serve(port=metrics_port + worker_index)  # One port per worker process
+
+    # Every worker process keeps its own state files
+    message_manager = MessageManager(worker_state_path('message_state.json', worker_index, worker_count), 'message_state.json')
+    server_poller = ServerPoller(worker_index, worker_count)
+    fleet = BotFleet(message_manager, server_poller, worker_index, worker_count)
+    # Each bot starts as soon as its config is parsed and validated
+    async for bot_config, bot_name in load_bot_configs(wanted=fleet.owns):
+        fleet.start_bot(bot_config, bot_name)
+
+    if status_queue is not None:
+        asyncio.ensure_future(report_status(fleet, status_queue))
 
-    tasks = [setup_discord_bot(message_manager, bot_config, bot_name, stagger_delay) for bot_config, bot_name in bot_configs]
-    
-    await asyncio.gather(*tasks)
+    try:
+        await HotReloader(fleet).run()
+    finally:
+        await connection_pool.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Run every Bots/ config in this process.")
+    parser.add_argument('--metrics-port', type=int, default=None, help="Serve /metrics and /metrics.json on this local port.")
+    parser.add_argument('--message-log-sample-rate', type=float, default=1.0, help="Fraction of per-message chat log lines to keep.")
+    args = parser.parse_args()
+
+    asyncio.run(main(metrics_port=args.metrics_port, message_log_sample_rate=args.message_log_sample_rate))